@@ -1,10 +1,11 @@
 from crewai import Agent
+from .config import llm_for, verbose_enabled
 from .tools import web_search_tool, router_tool
 
-def create_agents(llm, rag_tool):
-    """Create all agents for the RAG crew"""
-    
-    router_agent = Agent(
+def create_router_agent(llm):
+    """Create the Router agent"""
+    verbose = verbose_enabled()
+    return Agent(
         role='Router',
         goal='Route user question to a vectorstore or web search',
         backstory=(
@@ -12,10 +13,30 @@ def create_agents(llm, rag_tool):
             "Use the vectorstore for questions on concept related to Retrieval-Augmented Generation."
             "You do not need to be stringent with the keywords in the question related to these topics. Otherwise, use web-search."
         ),
-        verbose=True,
+        verbose=verbose,
         allow_delegation=False,
         llm=llm,
     )
+
+def create_agents(llm, rag_tool, llm_cache=None, uncached_agents=()):
+    """Create all agents for the RAG crew.
+
+    llm is one LLM shared by every agent or a mapping from agent name (the
+    keys of the returned dict, plus 'default') to LLM, as built by
+    config.setup_llms. With an llm_cache (see llm_cache.LLMResponseCache) every agent's LLM
+    calls are memoized, except for the agents named in uncached_agents
+    (keys of the returned dict, e.g. 'answer_grader').
+    """
+    
+    verbose = verbose_enabled()
+    
+    def agent_llm(name):
+        if llm_cache is None:
+            return llm_for(llm, name)
+        from .llm_cache import with_cache
+        return with_cache(llm_for(llm, name), False if name in uncached_agents else llm_cache)
+    
+    router_agent = create_router_agent(agent_llm('router'))
     
     retriever_agent = Agent(
         role="Retriever",
@@ -25,12 +46,27 @@ def create_agents(llm, rag_tool):
             "Use the information present in the retrieved context to answer the question."
             "You have to provide a clear concise answer."
         ),
-        verbose=True,
+        verbose=verbose,
         allow_delegation=False,
-        llm=llm,
+        llm=agent_llm('retriever'),
         tools=[rag_tool, web_search_tool],
     )
 
+    # Same role as the retriever so compaction and streaming treat its output alike
+    synthesizer_agent = Agent(
+        role="Retriever",
+        goal="Answer the question from the retrieved vectorstore and web search results",
+        backstory=(
+            "You are an assistant for question-answering tasks."
+            "Use the information present in the retrieved context to answer the question."
+            "You have to provide a clear concise answer."
+        ),
+        verbose=verbose,
+        allow_delegation=False,
+        llm=agent_llm('synthesizer'),
+        tools=[],
+    )
+
     grader_agent = Agent(
         role='Answer Grader',
         goal='Filter out erroneous retrievals',
@@ -39,9 +75,9 @@ def create_agents(llm, rag_tool):
             "If the document contains keywords related to the user question, grade it as relevant."
             "It does not need to be a stringent test.You have to make sure that the answer is relevant to the question."
         ),
-        verbose=True,
+        verbose=verbose,
         allow_delegation=False,
-        llm=llm,
+        llm=agent_llm('grader'),
     )
     
     hallucination_grader = Agent(
@@ -51,9 +87,22 @@ def create_agents(llm, rag_tool):
             "You are a hallucination grader assessing whether an answer is grounded in / supported by a set of facts."
             "Make sure you meticulously review the answer and check if the response provided is in alignmnet with the question asked"
         ),
-        verbose=True,
+        verbose=verbose,
         allow_delegation=False,
-        llm=llm,
+        llm=agent_llm('hallucination_grader'),
+    )
+    
+    verification_grader = Agent(
+        role="Verification Grader",
+        goal="Check retrieved content for relevance and grounding in a single pass",
+        backstory=(
+            "You are a grader assessing both whether retrieved content is relevant to a user question "
+            "and whether the answer it gives is grounded in / supported by the retrieved facts."
+            "It does not need to be a stringent relevance test, but you must flag unsupported claims."
+        ),
+        verbose=verbose,
+        allow_delegation=False,
+        llm=agent_llm('verification_grader'),
     )
     
     answer_grader = Agent(
@@ -64,15 +113,17 @@ def create_agents(llm, rag_tool):
             "You analyze the retrieved information and provide a comprehensive answer."
             "You work only with the information provided by previous agents and do not use any external tools."
         ),
-        verbose=True,
+        verbose=verbose,
         allow_delegation=False,
-        llm=llm,
+        llm=agent_llm('answer_grader'),
     )
     
     return {
         'router': router_agent,
         'retriever': retriever_agent,
+        'synthesizer': synthesizer_agent,
         'grader': grader_agent,
         'hallucination_grader': hallucination_grader,
+        'verification_grader': verification_grader,
         'answer_grader': answer_grader
     }
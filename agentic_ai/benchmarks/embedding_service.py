@@ -0,0 +1,114 @@
+"""
+Memory and throughput of per-process embedding models vs the shared embedding service.
+
+Starts --workers worker processes, each embedding --queries query strings
+from --threads threads at once (drawn from --unique distinct strings, so
+repeats exercise the service's query cache). In 'in_process' mode every
+worker loads its own model; in 'service' mode one embedding service
+(embedding_service.py) serves them all. Reports peak RSS per worker, host
+RSS (workers + service) and embeddings/sec across all workers.
+
+    python -m agentic_ai.benchmarks.embedding_service --workers 4 --threads 8 --modes in_process service
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_WORKER = r'''
+import json, os, random, resource, sys, time
+from concurrent.futures import ThreadPoolExecutor
+threads, n_queries, unique, model = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]), sys.argv[4]
+from agentic_ai.embeddings import embed_query, preload_embeddings
+preload_embeddings(model)
+rng = random.Random(os.getpid())
+queries = [f"question {rng.randrange(unique)} about attention heads and positional encodings"
+           for _ in range(n_queries)]
+print("ready", flush=True)
+sys.stdin.readline()
+start = time.time()
+with ThreadPoolExecutor(threads) as pool:
+    list(pool.map(lambda query: embed_query(query, model_name=model), queries))
+print(json.dumps({"start": start, "end": time.time(),
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}), flush=True)
+'''
+
+def run_mode(mode, args):
+    env = dict(os.environ)
+    service = None
+    socket_path = os.path.join(tempfile.mkdtemp(prefix="agentic-ai-embed-"), "embeddings.sock")
+    if args.quantize:
+        env["AGENTIC_AI_EMBEDDING_QUANTIZE"] = args.quantize
+    if mode == "service":
+        command = [sys.executable, "-m", "agentic_ai.embedding_service", "--socket", socket_path,
+                   "--model", args.model, "--max-wait-ms", str(args.max_wait_ms)]
+        if args.quantize:
+            command += ["--quantize", args.quantize]
+        service = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)
+        from agentic_ai.embedding_service import EmbeddingClient
+        client = EmbeddingClient(socket_path)
+        client.wait()
+        env["AGENTIC_AI_EMBEDDING_SOCKET"] = socket_path
+
+    workers = [
+        subprocess.Popen([sys.executable, "-c", _WORKER, str(args.threads), str(args.queries), str(args.unique),
+                          args.model], env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(args.workers)
+    ]
+    try:
+        for worker in workers:
+            if worker.stdout.readline().strip() != "ready":
+                raise RuntimeError("Embedding benchmark worker failed to start")
+        for worker in workers:
+            worker.stdin.write("go\n")
+            worker.stdin.flush()
+        reports = [json.loads(worker.stdout.readline()) for worker in workers]
+        result = {
+            "mode": mode,
+            "quantize": args.quantize,
+            "workers": args.workers,
+            "threads_per_worker": args.threads,
+            "embeddings": args.workers * args.queries,
+            "embeddings_per_s": args.workers * args.queries / (
+                max(report["end"] for report in reports) - min(report["start"] for report in reports)),
+            "worker_peak_rss_mb": [report["peak_rss_mb"] for report in reports],
+        }
+        result["mean_worker_rss_mb"] = sum(result["worker_peak_rss_mb"]) / args.workers
+        result["host_rss_mb"] = sum(result["worker_peak_rss_mb"])
+        if service is not None:
+            metrics = client.metrics()
+            result["service"] = metrics
+            result["host_rss_mb"] += metrics["peak_rss_mb"]
+            client.close()
+        return result
+    finally:
+        for worker in workers:
+            worker.wait()
+        if service is not None:
+            service.terminate()
+            service.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modes", nargs="+", choices=["in_process", "service"], default=["in_process", "service"])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent queries per worker")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per worker")
+    parser.add_argument("--unique", type=int, default=100, help="Distinct query strings")
+    parser.add_argument("--quantize", choices=["int8", "onnx", "onnx-int8"], default=None)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--model", default="BAAI/bge-small-en-v1.5")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = [run_mode(mode, args) for mode in args.modes]
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+
+if __name__ == "__main__":
+    main()
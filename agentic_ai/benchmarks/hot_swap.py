@@ -0,0 +1,112 @@
+"""
+Index update time and query availability of the live (hot-swapped) corpus index.
+
+Builds a corpus of --docs PDF copies, measures a full build, then measures
+incremental updates (replace, add and remove documents) while client threads
+keep querying the index. Availability is the share of queries that returned
+results during the updates.
+
+Copies of one seed PDF share their text, so a replaced copy reuses every
+embedding; pass several distinct --seed PDFs to measure re-embedding too.
+
+    python -m agentic_ai.benchmarks.hot_swap --docs 50 --clients 4
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from agentic_ai.benchmarks.ingest_throughput import build_corpus
+from agentic_ai.benchmarks.pipeline import percentile
+
+QUERIES = ["multi-head attention", "positional encoding", "scaled dot-product attention", "training schedule"]
+
+def replace_docs(seeds, n_docs, target_dir):
+    """Overwrite the first n_docs copies with a new revision (the next seed, when there are several)"""
+    for i in range(n_docs):
+        with open(seeds[(i + 1) % len(seeds)], "rb") as file:
+            data = file.read()
+        with open(os.path.join(target_dir, f"doc_{i:05d}.pdf"), "wb") as file:
+            file.write(data + f"\n% revision {i}\n".encode())
+
+def query_load(index, clients, stop):
+    """Query the index from client threads until stop is set; returns per-query outcomes"""
+    from agentic_ai.embeddings import embed_query
+    vectors = [embed_query(query) for query in QUERIES]
+    outcomes = []
+
+    def client(offset):
+        i = offset
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                ok = bool(index.search(vectors[i % len(vectors)], 3))
+            except Exception:
+                ok = False
+            outcomes.append((ok, time.perf_counter() - start))
+            i += 1
+
+    threads = [threading.Thread(target=client, args=(n,), daemon=True) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--changes", type=int, default=5, help="Documents replaced per update")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--seed", nargs="*", help="Seed PDFs (default: the setup_pdf paper)")
+    parser.add_argument("--backend", choices=["chroma", "numpy"], default="numpy")
+    args = parser.parse_args()
+
+    from agentic_ai.live_index import LiveIndex
+    seeds = args.seed
+    if not seeds:
+        from agentic_ai.tools import prepare_pdf
+        seeds = [prepare_pdf()["path"]]
+
+    work_dir = tempfile.mkdtemp(prefix="agentic_ai_hot_swap_")
+    try:
+        corpus_dir = os.path.join(work_dir, "pdfs")
+        os.makedirs(corpus_dir)
+        build_corpus(seeds, args.docs, corpus_dir)
+        index = LiveIndex(os.path.join(work_dir, "index"), backend=args.backend, refresh_interval_s=None)
+        report = {"settings": vars(args), "full_build": index.update(corpus_dir), "updates": []}
+
+        stop = threading.Event()
+        threads, outcomes = query_load(index, args.clients, stop)
+        steps = [
+            ("replace", lambda: replace_docs(seeds, args.changes, corpus_dir)),
+            ("add", lambda: shutil.copy(os.path.join(corpus_dir, "doc_00000.pdf"),
+                                        os.path.join(corpus_dir, "added.pdf"))),
+            ("remove", lambda: os.remove(os.path.join(corpus_dir, "added.pdf"))),
+        ]
+        try:
+            for name, change in steps:
+                time.sleep(0.5)
+                change()
+                stats = index.update(corpus_dir)
+                report["updates"].append({"change": name, **stats})
+            time.sleep(0.5)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        latencies = [latency for _, latency in outcomes]
+        report["queries_during_updates"] = {
+            "queries": len(outcomes),
+            "availability": sum(ok for ok, _ in outcomes) / len(outcomes) if outcomes else None,
+            "p50_s": percentile(latencies, 50),
+            "p99_s": percentile(latencies, 99),
+            "max_s": max(latencies, default=None),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
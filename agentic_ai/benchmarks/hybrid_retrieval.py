@@ -0,0 +1,88 @@
+"""
+Recall@k and latency of hybrid retrieval vs the current PDF tool.
+
+Each labelled question names a phrase from the passage that answers it; a
+question counts as recalled at k when one of the top-k results contains it.
+
+    python -m agentic_ai.benchmarks.hybrid_retrieval --k 1 3 5
+"""
+import argparse
+import json
+import time
+
+# (question, phrase from the answering passage of "Attention Is All You Need")
+LABELLED = [
+    ("What is multi-head attention?", "Multi-head attention allows the model to jointly attend"),
+    ("Why are positional encodings needed?", "we must inject some information about the relative or absolute position"),
+    ("What is scaled dot-product attention?", "We call our particular attention \"Scaled Dot-Product Attention\""),
+    ("Why is the dot product scaled by the square root of dk?", "dot products grow large in magnitude"),
+    ("How many layers does the encoder have?", "The encoder is composed of a stack of N = 6 identical layers"),
+    ("Which optimizer was used for training?", "We used the Adam optimizer"),
+    ("How long did it take to train the big models?", "The big models were trained for 300,000 steps"),
+    ("What hardware were the models trained on?", "8 NVIDIA P100 GPUs"),
+    ("What label smoothing value was used?", "label smoothing of value"),
+    ("What BLEU score does the big model get on English-to-German?", "28.4"),
+    ("What does the feed-forward network in each layer consist of?", "two linear transformations with a ReLU activation"),
+    ("How is the decoder prevented from attending to subsequent positions?", "masking out (setting to"),
+    ("Why use self-attention instead of recurrent layers?", "computational complexity per layer"),
+    ("What dropout rate was used for the base model?", "Pdrop = 0.1"),
+    ("How were the sinusoidal positional encodings defined?", "sine and cosine functions of different frequencies"),
+]
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+def hit_rank(results, phrase):
+    """1-based rank of the first result containing phrase, or None"""
+    phrase = normalize(phrase)
+    for rank, text in enumerate(results, 1):
+        if phrase in normalize(text):
+            return rank
+    return None
+
+def evaluate(search, ks):
+    """search(question, k) -> list of result texts"""
+    max_k = max(ks)
+    ranks, latencies = [], []
+    for question, phrase in LABELLED:
+        start = time.perf_counter()
+        results = search(question, max_k)
+        latencies.append(time.perf_counter() - start)
+        ranks.append(hit_rank(results, phrase))
+    latencies.sort()
+    return {
+        **{f"recall@{k}": sum(rank is not None and rank <= k for rank in ranks) / len(ranks) for k in ks},
+        "mrr": sum(1.0 / rank for rank in ranks if rank) / len(ranks),
+        "mean_latency_s": sum(latencies) / len(latencies),
+        "p95_latency_s": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--skip-pdf-tool", action="store_true", help="Skip the embedchain PDFSearchTool baseline")
+    args = parser.parse_args()
+
+    from agentic_ai.embeddings import embed_query
+    from agentic_ai.hybrid import HybridRetriever
+    from agentic_ai.tools import setup_pdf
+
+    hybrid_tool = setup_pdf(hybrid=True)
+    backend, bm25 = hybrid_tool.backend, hybrid_tool.retriever.bm25
+    report = {
+        "dense": evaluate(lambda q, k: [hit[1] for hit in backend.search(embed_query(q), k)], args.k),
+        "bm25": evaluate(lambda q, k: [hit[1] for hit in bm25.search(q, k)], args.k),
+        "hybrid_rrf": evaluate(
+            lambda q, k: [hit[1] for hit in HybridRetriever(backend, bm25).search(q, k)], args.k),
+        "hybrid_rrf_rerank": evaluate(
+            lambda q, k: [hit[1] for hit in HybridRetriever(backend, bm25, rerank=True).search(q, k)], args.k),
+    }
+    if not args.skip_pdf_tool:
+        # PDFSearchTool returns one string with its fixed top-k, so rank within it is unknown
+        pdf_tool = setup_pdf()
+        report["pdf_search_tool"] = evaluate(lambda q, k: [pdf_tool._run(query=q)], args.k)
+        report["pdf_search_tool"]["note"] = "single result string; recall@k is recall at the tool's own top-k"
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Ingestion throughput benchmark at 10, 100 and 1000 documents.
+
+The corpus is built by replicating the given seed PDFs (by default the cached
+NeurIPS paper) with a unique trailing comment per copy, so every file has its
+own hash and is actually ingested. Each size runs in a fresh interpreter into
+an empty index, and peak RSS covers the parent and the parser processes.
+
+    python -m agentic_ai.benchmarks.ingest_throughput --sizes 10 100 1000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+_CHILD = (
+    "import json, resource, sys\n"
+    "from agentic_ai.ingest import ingest\n"
+    "stats = ingest(sys.argv[1], sys.argv[2], workers=int(sys.argv[3]) or None)\n"
+    "stats['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024\n"
+    "stats['peak_child_rss_mb'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024\n"
+    "print(json.dumps(stats))\n"
+)
+
+def build_corpus(seeds, n_docs, target_dir):
+    """Write n_docs distinct PDF copies of the seed files into target_dir"""
+    for i in range(n_docs):
+        with open(seeds[i % len(seeds)], "rb") as file:
+            data = file.read()
+        with open(os.path.join(target_dir, f"doc_{i:05d}.pdf"), "wb") as file:
+            file.write(data + f"\n% copy {i}\n".encode())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seed", nargs="*", help="Seed PDFs (default: the setup_pdf paper)")
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    seeds = args.seed
+    if not seeds:
+        from agentic_ai.tools import prepare_pdf
+        seeds = [prepare_pdf()["path"]]
+
+    report = {}
+    for size in args.sizes:
+        work_dir = tempfile.mkdtemp(prefix="agentic_ai_ingest_")
+        try:
+            corpus_dir = os.path.join(work_dir, "pdfs")
+            os.makedirs(corpus_dir)
+            build_corpus(seeds, size, corpus_dir)
+            output = subprocess.run(
+                [sys.executable, "-c", _CHILD, corpus_dir, os.path.join(work_dir, "index"), str(args.workers)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            report[size] = json.loads(output.strip().splitlines()[-1])
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Cold vs warm startup benchmark for setup_pdf.
+
+Each run happens in a fresh interpreter so in-process caches (imported modules,
+loaded embedding model) do not flatter the warm numbers.
+
+    python -m agentic_ai.benchmarks.pdf_startup --runs 3
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+_CHILD = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "from agentic_ai.tools import setup_pdf\n"
+    "setup_pdf(cache_dir=sys.argv[1])\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+def time_setup_pdf(cache_dir):
+    """Run setup_pdf in a subprocess and return (wall_seconds, in_process_seconds)"""
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD, cache_dir],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return time.perf_counter() - start, float(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {"cold": [], "warm": []}
+    for _ in range(args.runs):
+        cache_dir = tempfile.mkdtemp(prefix="agentic_ai_bench_")
+        try:
+            results["cold"].append(time_setup_pdf(cache_dir))
+            results["warm"].append(time_setup_pdf(cache_dir))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    report = {}
+    for phase, timings in results.items():
+        report[phase] = {
+            "wall_s": [round(wall, 3) for wall, _ in timings],
+            "setup_pdf_s": [round(inner, 3) for _, inner in timings],
+            "mean_setup_pdf_s": round(sum(inner for _, inner in timings) / len(timings), 3),
+        }
+    report["speedup"] = round(report["cold"]["mean_setup_pdf_s"] / report["warm"]["mean_setup_pdf_s"], 2)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
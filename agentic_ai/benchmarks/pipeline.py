@@ -0,0 +1,203 @@
+"""
+Offline end-to-end pipeline benchmark.
+
+Runs the real create_rag_crew / run_rag_batch flow against a local
+OpenAI-compatible stub LLM and a Tavily stand-in, so orchestration changes
+can be compared without provider noise. The rag_tool is a stub with fixed
+latency unless --real-rag is given.
+
+    python -m agentic_ai.benchmarks.pipeline --concurrency 1 4 8 --modes default fused
+"""
+import argparse
+import json
+import os
+import resource
+import time
+from functools import partial
+from typing import Any, Type
+from crewai_tools import BaseTool
+from pydantic import BaseModel, Field
+
+# (question, expected route, keywords a good answer mentions)
+QUESTIONS = [
+    ("Tell me about self-attention mechanism in Transformers?", "vectorstore", ("attention", "positions", "sequence")),
+    ("How does multi-head attention work?", "vectorstore", ("heads", "attention", "parallel")),
+    ("Why does the Transformer use positional encodings?", "vectorstore", ("position", "order", "sinusoid")),
+    ("What is scaled dot-product attention?", "vectorstore", ("queries", "keys", "softmax")),
+    ("How is the encoder-decoder attention computed?", "vectorstore", ("decoder", "encoder", "queries")),
+    ("Tell me about LLMs using web_search?", "websearch", ("language", "models")),
+    ("What are the latest developments in AI?", "websearch", ("ai",)),
+    ("Current trends in machine learning?", "websearch", ("learning",)),
+    ("Recent breakthroughs in natural language processing?", "websearch", ("language",)),
+    ("Who won the most recent Turing award?", "websearch", ("turing",)),
+]
+
+class StubRagToolSchema(BaseModel):
+    query: str = Field(..., description="Mandatory query you want to use to search the PDF's content")
+
+class StubRagTool(BaseTool):
+    name: str = "Search a PDF's content"
+    description: str = "A tool that can be used to semantic search a query from a PDF's content."
+    args_schema: Type[BaseModel] = StubRagToolSchema
+    latency_s: float = 0.05
+
+    def _run(self, query: str, **kwargs: Any) -> str:
+        from agentic_ai.instrumentation import tool_span
+        with tool_span("rag_tool"):
+            time.sleep(self.latency_s)
+            return f"Relevant Content:\nThe paper explains {query} in section 3."
+
+def keyword_recall(answer, keywords):
+    """Share of expected keywords that appear in an answer"""
+    text = str(answer).lower()
+    return sum(keyword in text for keyword in keywords) / len(keywords)
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def build_crew(mode, llm, rag_tool, compact_context=False, llm_cache=None, parallel_retrieval=False):
+    from agentic_ai.crew import create_rag_crew
+    return create_rag_crew(
+        llm, rag_tool,
+        prerouted=mode.startswith("prerouted"),
+        fused_verification=mode.endswith("fused"),
+        compact_context=compact_context,
+        llm_cache=llm_cache,
+        parallel_retrieval=parallel_retrieval,
+    )
+
+def build_parallel(mode, llm, rag_tool, compact_context=False, llm_cache=None):
+    """ParallelRetrieval for the *parallel* modes: 'parallel' always searches both
+    sources, 'prerouted_parallel' only for questions the PreRouter finds ambiguous"""
+    if "parallel" not in mode:
+        return None
+    from agentic_ai.parallel_retrieval import ParallelRetrieval
+    make_crew = partial(build_crew, mode, llm, rag_tool, compact_context, llm_cache, parallel_retrieval=True)
+    return ParallelRetrieval(make_crew, rag_tool, always=not mode.startswith("prerouted"))
+
+def run_benchmark(modes, concurrency_levels, repeats, llm_latency_s, tokens_per_s, search_latency_s,
+                  rag_latency_s, real_rag=False, compact_context=False, llm_options=None, llm_cache=False):
+    from agentic_ai.benchmarks.stub_servers import llm_server, tavily_server
+    from agentic_ai.config import setup_llm
+    from agentic_ai.crew import run_rag_batch
+    from agentic_ai.instrumentation import InMemorySink, add_sink, remove_sink
+
+    report = {
+        "settings": {
+            "llm_latency_s": llm_latency_s,
+            "tokens_per_s": tokens_per_s,
+            "search_latency_s": search_latency_s,
+            "rag_latency_s": rag_latency_s,
+            "questions": len(QUESTIONS) * repeats,
+            "compact_context": compact_context,
+            "llm_cache": llm_cache,
+        },
+        "runs": [],
+    }
+    with llm_server(latency_s=llm_latency_s, tokens_per_s=tokens_per_s) as llm_stub, \
+            tavily_server(latency_s=search_latency_s) as search_stub:
+        os.environ["TAVILY_API_URL"] = f"{search_stub.url}/search"
+        os.environ.setdefault("TAVILY_API_KEY", "stub")
+        if llm_options is None:
+            llm_options = {"api_base": f"{llm_stub.url}/v1", "api_key": "stub", "model": "stub-llm"}
+        llm = setup_llm(**llm_options)
+        if real_rag:
+            from agentic_ai.tools import setup_pdf
+            rag_tool = setup_pdf()
+        else:
+            rag_tool = StubRagTool(latency_s=rag_latency_s)
+
+        prerouter = None
+        if any(mode.startswith("prerouted") for mode in modes):
+            from agentic_ai.router import PreRouter
+            prerouter = PreRouter.from_pdf(llm) if real_rag else PreRouter(llm, centroids=None)
+
+        questions = [question for question, _, _ in QUESTIONS] * repeats
+        keywords = [expected for _, _, expected in QUESTIONS] * repeats
+        for mode in modes:
+            # One in-memory cache per mode, kept across its concurrency levels (metrics are cumulative)
+            cache = None
+            if llm_cache:
+                from agentic_ai.llm_cache import LLMResponseCache
+                cache = LLMResponseCache()
+            make_crew = partial(build_crew, mode, llm, rag_tool, compact_context, cache)
+            parallel = build_parallel(mode, llm, rag_tool, compact_context, cache)
+            for concurrency in concurrency_levels:
+                sink = InMemorySink()
+                add_sink(sink)
+                llm_requests = llm_stub.stats["requests"]
+                start = time.perf_counter()
+                try:
+                    results = run_rag_batch(
+                        make_crew, questions, max_concurrency=concurrency,
+                        prerouter=prerouter if mode.startswith("prerouted") else None,
+                        parallel=parallel,
+                    )
+                finally:
+                    remove_sink(sink)
+                elapsed_s = time.perf_counter() - start
+                latencies = [item["latency_s"] for item in results]
+                summaries = [item["summary"] for item in results]
+                answered = [(item["result"], expected) for item, expected in zip(results, keywords)
+                            if item["error"] is None]
+                report["runs"].append({
+                    "mode": mode,
+                    "concurrency": concurrency,
+                    "queries": len(results),
+                    "errors": sum(item["error"] is not None for item in results),
+                    "p50_s": percentile(latencies, 50),
+                    "p95_s": percentile(latencies, 95),
+                    "p99_s": percentile(latencies, 99),
+                    "throughput_qps": len(results) / elapsed_s,
+                    "llm_calls_per_query": (llm_stub.stats["requests"] - llm_requests) / len(results),
+                    "prompt_tokens_per_query": sum(s["prompt_tokens"] for s in summaries) / len(results),
+                    "completion_tokens_per_query": sum(s["completion_tokens"] for s in summaries) / len(results),
+                    "context_tokens_saved_per_query": sum(s["context_tokens_saved"] for s in summaries) / len(results),
+                    "answer_keyword_recall": (
+                        sum(keyword_recall(answer, expected) for answer, expected in answered) / len(answered)
+                        if answered else None
+                    ),
+                    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                    "llm_cache": cache.metrics() if cache is not None else None,
+                    "parallel_retrieval": parallel.metrics() if parallel is not None else None,
+                })
+            if parallel is not None:
+                parallel.close()
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modes", nargs="+", default=["default", "fused"],
+                        choices=["default", "fused", "prerouted", "prerouted_fused", "parallel", "parallel_fused",
+                                 "prerouted_parallel", "prerouted_parallel_fused"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeats", type=int, default=1, help="Passes over the question corpus")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-s", type=float, default=500.0)
+    parser.add_argument("--search-latency", type=float, default=0.1)
+    parser.add_argument("--rag-latency", type=float, default=0.05)
+    parser.add_argument("--real-rag", action="store_true", help="Use setup_pdf() instead of the stub rag_tool")
+    parser.add_argument("--compact", action="store_true", help="Enable context compaction")
+    parser.add_argument("--llm-cache", action="store_true", help="Memoize LLM calls in an in-memory LLM cache")
+    parser.add_argument("--live-llm", action="store_true",
+                        help="Use the LLM configured by setup_llm() instead of the stub (for answer quality)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AGENTIC_AI_ENV", "production")
+    report = run_benchmark(args.modes, args.concurrency, args.repeats, args.llm_latency,
+                           args.tokens_per_s, args.search_latency, args.rag_latency, args.real_rag,
+                           compact_context=args.compact, llm_options={} if args.live_llm else None,
+                           llm_cache=args.llm_cache)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Provider pool benchmark: latency-aware balancing, hedging and failover.
+
+Two stub LLM servers stand in for a primary and a secondary endpoint. The
+primary has a latency tail (every --slow-every-th request is slow) and, in
+the failover scenario, answers every request with a 503 from halfway
+through the run. Each scenario
+sends the same prompts through a ProviderPool from concurrent clients and
+reports end-to-end percentiles, errors and per-provider histograms.
+
+    python -m agentic_ai.benchmarks.providers --requests 200 --concurrency 8
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from agentic_ai.benchmarks.pipeline import percentile
+
+def build_pool(urls, max_hedges):
+    from agentic_ai.config import create_chat_model
+    from agentic_ai.providers import Provider, ProviderPool
+    providers = [
+        Provider(name, create_chat_model(f"{url}/v1", "stub", "stub-llm", max_retries=0, request_timeout=30))
+        for name, url in urls
+    ]
+    return ProviderPool(providers=providers, max_hedges=max_hedges, hedge_min_samples=10, hedge_min_s=0.05)
+
+def run_scenario(name, pool, requests, concurrency, on_halfway=None):
+    def one(index):
+        if on_halfway is not None and index == requests // 2:
+            on_halfway()
+        start = time.perf_counter()
+        try:
+            pool.invoke([("system", "You are Answer Grader."), ("human", f"question: is answer {index} relevant?")])
+            return True, time.perf_counter() - start
+        except Exception:
+            return False, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(requests)))
+    elapsed_s = time.perf_counter() - start
+    latencies = [latency for ok, latency in results if ok]
+    return {
+        "scenario": name,
+        "requests": requests,
+        "errors": sum(not ok for ok, _ in results),
+        "throughput_qps": len(latencies) / elapsed_s,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "providers": pool.metrics(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.1, help="Base latency of both stubs")
+    parser.add_argument("--secondary-latency", type=float, default=0.15)
+    parser.add_argument("--slow-every", type=int, default=10)
+    parser.add_argument("--slow-latency", type=float, default=1.5)
+    args = parser.parse_args()
+
+    from agentic_ai.benchmarks.stub_servers import llm_server
+
+    report = {"settings": vars(args), "scenarios": []}
+    scenarios = [("single_provider", 0, False), ("pool_no_hedging", 0, False),
+                 ("pool_hedging", 1, False), ("pool_failover", 1, True)]
+    for name, max_hedges, fail_primary in scenarios:
+        primary = llm_server(latency_s=args.latency, tokens_per_s=1e6,
+                             slow_every=args.slow_every, slow_latency_s=args.slow_latency).start()
+        secondary = llm_server(latency_s=args.secondary_latency, tokens_per_s=1e6).start()
+        try:
+            urls = [("primary", primary.url)]
+            if name != "single_provider":
+                urls.append(("secondary", secondary.url))
+            pool = build_pool(urls, max_hedges)
+            report["scenarios"].append(run_scenario(
+                name, pool, args.requests, args.concurrency,
+                on_halfway=(lambda: setattr(primary.handler, "fail_every", 1)) if fail_primary else None,
+            ))
+        finally:
+            primary.stop()
+            secondary.stop()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Query throughput and memory of the retrieval backends vs PDFSearchTool.
+
+Every tool is measured in a fresh interpreter: import + construction time,
+RSS after construction, end-to-end tool QPS (query embedding included) and,
+for the NumPy backend, raw top-k QPS on precomputed query vectors.
+
+    python -m agentic_ai.benchmarks.retrieval_backends --queries 200
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+
+QUERIES = [
+    "What is self-attention?",
+    "How does multi-head attention work?",
+    "Why are positional encodings added to the embeddings?",
+    "What is scaled dot-product attention?",
+    "How long did training the base model take?",
+    "Which optimizer and learning rate schedule were used?",
+    "What BLEU score does the big Transformer reach on English-to-German?",
+    "How is the decoder prevented from attending to future positions?",
+]
+
+_CHILD = r'''
+import json, resource, sys, time
+kind, index_dir, n_queries = sys.argv[1], sys.argv[2], int(sys.argv[3])
+queries = json.loads(sys.argv[4])
+start = time.perf_counter()
+if kind == "pdf_search_tool":
+    from agentic_ai.tools import setup_pdf
+    tool = setup_pdf()
+    run = lambda query: tool._run(query=query)
+    backend = None
+else:
+    from agentic_ai.retrieval import setup_corpus
+    options = {"quantize": True} if kind == "numpy_int8" else {}
+    tool = setup_corpus(index_dir, backend="numpy" if kind.startswith("numpy") else "chroma", **options)
+    run = lambda query: tool._run(query=query)
+    backend = tool.backend
+setup_s = time.perf_counter() - start
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+run(queries[0])
+start = time.perf_counter()
+for i in range(n_queries):
+    run(queries[i % len(queries)])
+tool_qps = n_queries / (time.perf_counter() - start)
+result = {"setup_s": setup_s, "rss_after_setup_mb": rss_mb, "tool_qps": tool_qps}
+if backend is not None:
+    from agentic_ai.embeddings import embed_texts
+    vectors = embed_texts(queries)
+    start = time.perf_counter()
+    for i in range(n_queries * 10):
+        backend.search(vectors[i % len(vectors)], 3)
+    result["search_qps"] = n_queries * 10 / (time.perf_counter() - start)
+result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(result))
+'''
+
+def run_child(kind, index_dir, n_queries):
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD, kind, index_dir, str(n_queries), json.dumps(QUERIES)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    from agentic_ai.ingest import ingest
+    from agentic_ai.retrieval import open_backend
+    from agentic_ai.tools import prepare_pdf
+
+    pdf_path = prepare_pdf()["path"]
+    work_dir = tempfile.mkdtemp(prefix="agentic_ai_retrieval_")
+    try:
+        source = f"{work_dir}/manifest.txt"
+        with open(source, "w") as file:
+            file.write(pdf_path + "\n")
+        index_dirs = {}
+        for kind, backend, options in [
+            ("chroma", "chroma", {}),
+            ("numpy", "numpy", {}),
+            ("numpy_int8", "numpy", {"quantize": True}),
+        ]:
+            index_dirs[kind] = f"{work_dir}/{kind}"
+            ingest(source, index_dirs[kind], backend=open_backend(index_dirs[kind], backend, **options))
+
+        report = {"pdf_search_tool": run_child("pdf_search_tool", "", args.queries)}
+        for kind, index_dir in index_dirs.items():
+            report[kind] = run_child(kind, index_dir, args.queries)
+        print(json.dumps(report, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
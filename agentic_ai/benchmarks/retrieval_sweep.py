@@ -0,0 +1,162 @@
+"""
+Retrieval quality vs cost across chunking and top-k settings, with a Pareto report.
+
+Every (chunk size, overlap) pair is ingested into its own index (ingest.py)
+and every labelled question is searched once at the largest k. Each
+(chunk size, overlap, k) configuration then reports recall@k and MRR@k, the
+index build time and size, query latency (question embedding + search) and
+the estimated prompt tokens of the tool output the Retriever agent reads.
+Configurations no other configuration beats on all objectives form the
+Pareto front; differences within --tolerance (relative) count as ties so
+timing noise does not decide it.
+
+Labels default to the passages of benchmarks/hybrid_retrieval.py; --labels
+takes a JSON list of [question, phrase] pairs (or {"question", "phrase"}
+objects), where phrase is text from the answering passage.
+
+    python -m agentic_ai.benchmarks.retrieval_sweep --chunk-sizes 250 500 1000 2000 --overlaps 0 200 --k 1 3 5 8
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from agentic_ai.benchmarks.hybrid_retrieval import LABELLED, hit_rank
+
+OBJECTIVES = {"recall": "max", "mrr": "max", "prompt_tokens": "min", "mean_latency_s": "min"}
+
+def load_labels(path):
+    """(question, phrase) pairs from a JSON file"""
+    with open(path) as file:
+        labels = json.load(file)
+    return [(label["question"], label["phrase"]) if isinstance(label, dict) else tuple(label) for label in labels]
+
+def directory_bytes(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+def evaluate_chunking(pdfs, labels, chunk_size, chunk_overlap, ks, backend, work_dir):
+    """Build one index and score it at every k; returns one row per k"""
+    from agentic_ai.compaction import estimate_tokens
+    from agentic_ai.embeddings import embed_query
+    from agentic_ai.ingest import ingest
+    from agentic_ai.retrieval import format_hits, open_backend
+
+    index_dir = os.path.join(work_dir, f"chunks-{chunk_size}-{chunk_overlap}")
+    start = time.perf_counter()
+    stats = ingest(pdfs, index_dir, backend=backend, workers=1, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    build_s = time.perf_counter() - start
+    index = open_backend(index_dir, backend)
+
+    max_k = max(ks)
+    searches = []  # (hits, latency_s) per question
+    for question, _ in labels:
+        start = time.perf_counter()
+        hits = index.search(embed_query(question), max_k)
+        searches.append((hits, time.perf_counter() - start))
+    latencies = sorted(latency for _, latency in searches)
+    ranks = [hit_rank([hit[1] for hit in hits], phrase) for (hits, _), (_, phrase) in zip(searches, labels)]
+
+    rows = []
+    for k in ks:
+        rows.append({
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "k": k,
+            "recall": sum(rank is not None and rank <= k for rank in ranks) / len(ranks),
+            "mrr": sum(1.0 / rank for rank in ranks if rank and rank <= k) / len(ranks),
+            "prompt_tokens": sum(estimate_tokens(format_hits(hits[:k])) for hits, _ in searches) / len(searches),
+            "mean_latency_s": sum(latencies) / len(latencies),
+            "p95_latency_s": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+            "build_s": build_s,
+            "chunks": stats["chunks"],
+            "index_bytes": directory_bytes(index_dir),
+        })
+    shutil.rmtree(index_dir, ignore_errors=True)
+    return rows
+
+def dominates(a, b, objectives, tolerance=0.0):
+    """True when a is at least as good as b on every objective and better on one.
+
+    Values differing by at most tolerance (relative to the larger one) tie.
+    """
+    better = False
+    for metric, direction in objectives.items():
+        x, y = (a[metric], b[metric]) if direction == "max" else (b[metric], a[metric])
+        if abs(x - y) <= tolerance * max(abs(x), abs(y)):
+            continue
+        if x < y:
+            return False
+        better = True
+    return better
+
+def pareto_front(rows, objectives=OBJECTIVES, tolerance=0.0):
+    """Rows not dominated by any other row"""
+    return [row for row in rows if not any(dominates(other, row, objectives, tolerance) for other in rows)]
+
+def run_sweep(pdfs, labels, chunk_sizes, overlaps, ks, backend="numpy", objectives=OBJECTIVES, tolerance=0.1):
+    """Score every chunking/top-k combination; 'current' marks the production settings"""
+    from agentic_ai.embeddings import preload_embeddings
+    from agentic_ai.ingest import CHUNK_OVERLAP, CHUNK_SIZE
+    from agentic_ai.retrieval import DEFAULT_TOP_K
+
+    preload_embeddings()
+    work_dir = tempfile.mkdtemp(prefix="agentic-ai-sweep-")
+    rows = []
+    try:
+        for chunk_size in chunk_sizes:
+            for chunk_overlap in overlaps:
+                if chunk_overlap >= chunk_size:
+                    continue
+                rows.extend(evaluate_chunking(pdfs, labels, chunk_size, chunk_overlap, ks, backend, work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    front = pareto_front(rows, objectives, tolerance)
+    for row in rows:
+        row["pareto"] = row in front
+        row["current"] = (row["chunk_size"], row["chunk_overlap"], row["k"]) == (CHUNK_SIZE, CHUNK_OVERLAP,
+                                                                                DEFAULT_TOP_K)
+    return {
+        "labels": len(labels),
+        "objectives": objectives,
+        "tolerance": tolerance,
+        "pareto": sorted(front, key=lambda row: (-row["recall"], row["prompt_tokens"])),
+        "configs": rows,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdf", nargs="+", help="PDFs to index (default: the Attention paper)")
+    parser.add_argument("--labels", help="JSON file of [question, phrase] pairs")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[250, 500, 1000, 2000])
+    parser.add_argument("--overlaps", type=int, nargs="+", default=[0, 100, 200])
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 8])
+    parser.add_argument("--backend", choices=["chroma", "numpy"], default="numpy")
+    parser.add_argument("--objectives", nargs="+", default=[f"{metric}:{direction}"
+                                                           for metric, direction in OBJECTIVES.items()],
+                        help="metric:max|min pairs the Pareto front is computed on (e.g. index_bytes:min)")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Relative difference below which two values tie on an objective")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    pdfs = args.pdf
+    if not pdfs:
+        from agentic_ai.tools import prepare_pdf
+        pdfs = [prepare_pdf()["path"]]
+    labels = load_labels(args.labels) if args.labels else LABELLED
+    objectives = dict(objective.split(":") for objective in args.objectives)
+    report = run_sweep(pdfs, labels, args.chunk_sizes, args.overlaps, args.k, args.backend, objectives,
+                       args.tolerance)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
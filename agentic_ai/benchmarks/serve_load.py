@@ -0,0 +1,115 @@
+"""
+Local load test of the HTTP service against stub LLM and search servers.
+
+Starts the stub servers and agentic_ai.server in-process, then fires the
+pipeline benchmark questions at /query from concurrent clients. Questions
+repeat, so concurrent duplicates exercise request coalescing; a small
+--max-queue shows 503 load shedding.
+
+    python -m agentic_ai.benchmarks.serve_load --clients 16 --requests 200 --workers 4
+"""
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from agentic_ai.benchmarks.pipeline import QUESTIONS, StubRagTool, percentile
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(service, port):
+    import uvicorn
+    from agentic_ai.server import create_app
+    server = uvicorn.Server(uvicorn.Config(create_app(service), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    url = f"http://127.0.0.1:{port}"
+    while True:
+        try:
+            if requests.get(f"{url}/healthz", timeout=1).json()["ready"]:
+                return server, url
+        except (requests.RequestException, ValueError, KeyError):
+            pass
+        time.sleep(0.1)
+
+def run_load(url, clients, total_requests, timeout_s):
+    questions = [question for question, _, _ in QUESTIONS]
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=clients))
+
+    def one(index):
+        start = time.perf_counter()
+        try:
+            response = session.post(f"{url}/query", json={"question": questions[index % len(questions)]},
+                                    timeout=timeout_s)
+            status = response.status_code
+        except requests.RequestException:
+            status = "client_error"
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(one, range(total_requests)))
+    elapsed_s = time.perf_counter() - start
+    latencies = [latency for status, latency in results if status == 200]
+    return {
+        "clients": clients,
+        "requests": total_requests,
+        "status_counts": dict(Counter(str(status) for status, _ in results)),
+        "throughput_qps": len(latencies) / elapsed_s,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=100, help="Requests per client level")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-s", type=float, default=500.0)
+    parser.add_argument("--search-latency", type=float, default=0.1)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    from agentic_ai.benchmarks.stub_servers import llm_server, tavily_server
+    from agentic_ai.server import build_service
+
+    os.environ.setdefault("AGENTIC_AI_ENV", "production")
+    report = {"settings": vars(args), "runs": []}
+    with llm_server(latency_s=args.llm_latency, tokens_per_s=args.tokens_per_s) as llm_stub, \
+            tavily_server(latency_s=args.search_latency) as search_stub:
+        os.environ["TAVILY_API_URL"] = f"{search_stub.url}/search"
+        os.environ.setdefault("TAVILY_API_KEY", "stub")
+        service = build_service(
+            args.workers, args.max_queue, args.timeout, prerouted=False,
+            llm_options={"api_base": f"{llm_stub.url}/v1", "api_key": "stub", "model": "stub-llm"},
+            rag_tool=StubRagTool(), preload_embeddings=False,
+        )
+        server, url = start_server(service, free_port())
+        try:
+            for clients in args.clients:
+                llm_requests = llm_stub.stats["requests"]
+                run = run_load(url, clients, args.requests, args.timeout)
+                run["llm_calls"] = llm_stub.stats["requests"] - llm_requests
+                run["service"] = requests.get(f"{url}/metrics").json()
+                report["runs"].append(run)
+        finally:
+            server.should_exit = True
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Import-time and first-query-time benchmark for the warm startup mode.
+
+Each scenario runs in a fresh interpreter against the local stub LLM and a
+stub rag_tool, so only import, build and warmup costs differ:
+
+    eager   import everything, build the crew, then serve the first query
+    warm    import agentic_ai.warm, call warmup() and start "accepting
+            requests"; the first query arrives --arrival seconds later
+
+    python -m agentic_ai.benchmarks.startup --arrival 1.0
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+_CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+mode, arrival, llm_url = sys.argv[1], float(sys.argv[2]), sys.argv[3]
+llm_options = {"api_base": llm_url, "api_key": "stub", "model": "stub-llm"}
+result = {}
+if mode == "eager":
+    import agentic_ai.main
+    from agentic_ai.config import setup_llm
+    from agentic_ai.crew import create_rag_crew, run_rag_query
+    from agentic_ai.benchmarks.pipeline import StubRagTool
+    result["import_s"] = time.perf_counter() - t0
+    crew = create_rag_crew(setup_llm(**llm_options), StubRagTool(latency_s=0.0))
+    ready_s = time.perf_counter() - t0
+    query_start = time.perf_counter()
+    run_rag_query(crew, "What is self-attention?")
+else:
+    import agentic_ai.main
+    from agentic_ai.warm import WarmCrew
+    result["import_s"] = time.perf_counter() - t0
+    from agentic_ai.benchmarks.pipeline import StubRagTool
+    warm = WarmCrew(llm_options=llm_options, rag_tool=StubRagTool(latency_s=0.0),
+                    preload_embeddings="--embeddings" in sys.argv).warmup()
+    ready_s = time.perf_counter() - t0
+    time.sleep(arrival)
+    query_start = time.perf_counter()
+    warm.run("What is self-attention?")
+    result["warmup_timings"] = warm.timings
+result["accepting_requests_s"] = ready_s
+result["first_query_s"] = time.perf_counter() - query_start
+print(json.dumps(result))
+'''
+
+def run(mode, arrival, llm_url, embeddings):
+    argv = [sys.executable, "-c", _CHILD, mode, str(arrival), llm_url] + (["--embeddings"] if embeddings else [])
+    output = subprocess.run(argv, check=True, capture_output=True, text=True,
+                            env={**os.environ, "AGENTIC_AI_ENV": "production"}).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--arrival", type=float, default=1.0, help="Seconds before the first query arrives (warm)")
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--embeddings", action="store_true", help="Also preload the embedding model in warmup")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    from agentic_ai.benchmarks.stub_servers import llm_server
+    report = {"eager": [], "warm": []}
+    with llm_server(latency_s=args.llm_latency) as server:
+        for _ in range(args.runs):
+            for mode in report:
+                report[mode].append(run(mode, args.arrival, f"{server.url}/v1", args.embeddings))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
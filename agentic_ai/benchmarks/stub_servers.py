@@ -0,0 +1,205 @@
+"""
+Local stand-ins for the external services the pipeline talks to.
+
+Servers run in a daemon thread on 127.0.0.1 and add a configurable latency
+to every response, so orchestration changes can be measured without
+provider noise.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class StubServer:
+    """Run a handler class on a free local port until stop() is called"""
+
+    def __init__(self, handler_class, latency_s=0.0, **settings):
+        handler = type(handler_class.__name__, (handler_class,), {"latency_s": latency_s, **settings})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.handler = handler  # settings can be changed on it while serving
+        self.stats = handler.stats = {"requests": 0}
+        handler.lock = threading.Lock()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+class TavilyHandler(_StubHandler):
+    """Tavily /search stand-in returning deterministic results per query"""
+
+    def do_POST(self):
+        request = self.read_json()
+        time.sleep(self.latency_s)
+        self.stats["requests"] += 1
+        query = request.get("query", "")
+        digest = hashlib.sha256(query.encode()).hexdigest()
+        results = [
+            {
+                "title": f"Result {i} for {query}",
+                "url": f"https://example.com/{digest[i * 4:i * 4 + 8]}",
+                "content": f"Stub content {i} about {query}.",
+                "score": round(1.0 - i * 0.1, 2),
+            }
+            for i in range(int(request.get("max_results", 3)))
+        ]
+        self.send_json({"query": query, "results": results})
+
+def tavily_server(latency_s=0.05):
+    """Create (not start) a stub Tavily server; use its url as TAVILY_API_URL + '/search'"""
+    return StubServer(TavilyHandler, latency_s=latency_s)
+
+ROUTER_KEYWORDS = ("self-attention", "attention", "transformer", "encoder", "decoder", "positional")
+
+def _question(prompt):
+    match = re.search(r"(?:question:?|answer to:) (.+?)(?:\. |\n|$)", prompt)
+    return match.group(1).strip() if match else prompt[-200:].strip()
+
+def stub_reply(prompt, answer_tokens=120, verdict_pass=True):
+    """Deterministic ReAct-style reply for a crewai agent prompt"""
+    role_match = re.search(r"You are ([^.\n]+)\.", prompt)
+    role = role_match.group(1).strip() if role_match else ""
+    question = _question(prompt)
+
+    if role == "Router":
+        route = "vectorstore" if any(keyword in question.lower() for keyword in ROUTER_KEYWORDS) else "websearch"
+        return f"Thought: I now can give a great answer\nFinal Answer: {route}"
+    if role == "Retriever":
+        # Without tools (parallel retrieval synthesis) the context is already in the prompt
+        if "Observation:" in prompt or "only one name of [" not in prompt:
+            return f"Thought: I now know the final answer\nFinal Answer: Retrieved facts about {question}."
+        tools_match = re.search(r"only one name of \[([^\]]*)\]", prompt)
+        tools = [name.strip() for name in tools_match.group(1).split(",")] if tools_match else []
+        web = [name for name in tools if "web" in name]
+        pdf = [name for name in tools if "web" not in name]
+        use_web = "websearch" in prompt.split("Current Task:")[-1] or not pdf
+        tool = (web or tools or ["web_search_tool"])[0] if use_web else pdf[0]
+        return (
+            f"Thought: I should search for this.\nAction: {tool}\n"
+            f"Action Input: {json.dumps({'query': question})}"
+        )
+    if role == "Verification Grader":
+        verdict = {"relevant": verdict_pass, "grounded": verdict_pass, "reason": "stub verdict"}
+        return f"Thought: I now can give a great answer\nFinal Answer: {json.dumps(verdict)}"
+    if role in ("Answer Grader", "Hallucination Grader"):
+        return "Thought: I now can give a great answer\nFinal Answer: yes"
+    words = " ".join(f"token{i}" for i in range(answer_tokens))
+    return f"Thought: I now can give a great answer\nFinal Answer: {question} {words}"
+
+class OpenAIChatHandler(_StubHandler):
+    """OpenAI-compatible /v1/chat/completions stand-in.
+
+    Each response takes latency_s plus completion_tokens / tokens_per_s.
+    Every slow_every-th request takes slow_latency_s longer (a latency tail)
+    and every fail_every-th request fails with a 503.
+    """
+    tokens_per_s = 500.0
+    answer_tokens = 120
+    verdict_pass = True
+    slow_every = 0
+    slow_latency_s = 0.0
+    fail_every = 0
+
+    def do_POST(self):
+        request = self.read_json()
+        with self.lock:
+            self.stats["received"] = number = self.stats.get("received", 0) + 1
+        if self.fail_every and number % self.fail_every == 0:
+            time.sleep(self.latency_s)
+            self.send_json({"error": {"message": "stub overloaded", "type": "server_error"}}, status=503)
+            return
+        if self.slow_every and number % self.slow_every == 0:
+            time.sleep(self.slow_latency_s)
+        prompt = "\n".join(str(message.get("content", "")) for message in request.get("messages", []))
+        reply = stub_reply(prompt, self.answer_tokens, self.verdict_pass)
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(reply) // 4)
+        time.sleep(self.latency_s + completion_tokens / self.tokens_per_s)
+        self.stats["requests"] += 1
+        self.stats["prompt_tokens"] = self.stats.get("prompt_tokens", 0) + prompt_tokens
+        self.stats["completion_tokens"] = self.stats.get("completion_tokens", 0) + completion_tokens
+        if request.get("stream"):
+            self.send_stream(request.get("model", "stub"), reply.split("Final Answer:")[-1].strip())
+            return
+        self.send_json({
+            "id": f"chatcmpl-stub-{self.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def send_stream(self, model, text):
+        """Send the reply as server-sent chat.completion.chunk events, one per word"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        words = text.split(" ")
+        for index, word in enumerate(words):
+            chunk = {
+                "id": f"chatcmpl-stub-{self.stats['requests']}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if index == 0 else " " + word},
+                    "finish_reason": "stop" if index == len(words) - 1 else None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+def llm_server(latency_s=0.2, tokens_per_s=500.0, answer_tokens=120, verdict_pass=True,
+               slow_every=0, slow_latency_s=0.0, fail_every=0):
+    """Create (not start) a stub LLM server; use its url + '/v1' as the LLM api_base"""
+    return StubServer(OpenAIChatHandler, latency_s=latency_s, tokens_per_s=tokens_per_s,
+                      answer_tokens=answer_tokens, verdict_pass=verdict_pass,
+                      slow_every=slow_every, slow_latency_s=slow_latency_s, fail_every=fail_every)
@@ -0,0 +1,45 @@
+"""
+Web search latency and cache benchmark against the local Tavily stub.
+
+    python -m agentic_ai.benchmarks.web_search --latency 0.2 --queries 50
+"""
+import argparse
+import json
+import time
+from agentic_ai.benchmarks.stub_servers import tavily_server
+from agentic_ai.web_search import WebSearchClient
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub latency per request (s)")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--distinct", type=int, default=10, help="Distinct questions among the queries")
+    args = parser.parse_args()
+
+    with tavily_server(latency_s=args.latency) as server:
+        client = WebSearchClient(api_key="stub", api_url=f"{server.url}/search")
+        queries = [f"Question number {i % args.distinct}?" for i in range(args.queries)]
+
+        start = time.perf_counter()
+        for query in queries:
+            client.search(query)
+        sequential_s = time.perf_counter() - start
+
+        variants = [f"fan-out variant {i}" for i in range(8)]
+        start = time.perf_counter()
+        merged = client.search_many(variants)
+        fan_out_s = time.perf_counter() - start
+
+        report = {
+            "sequential_s": sequential_s,
+            "mean_query_latency_s": sequential_s / len(queries),
+            "fan_out_s": fan_out_s,
+            "fan_out_variants": len(variants),
+            "fan_out_merged_results": len(merged),
+            "stub_requests": server.stats["requests"],
+            "client": client.metrics(),
+        }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
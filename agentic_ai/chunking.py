@@ -0,0 +1,31 @@
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 0
+
+def extract_pdf_text(pdf_path):
+    """Extract the text of every page of a PDF"""
+    from pypdf import PdfReader
+    reader = PdfReader(pdf_path)
+    return [page.extract_text() or "" for page in reader.pages]
+
+def chunk_text(text, chunk_size, chunk_overlap):
+    """Split text the same way embedchain's PDF chunker does"""
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+    )
+    return [chunk for chunk in splitter.split_text(text) if chunk.strip()]
+
+def chunk_pdf_pages(pdf_path, chunk_size, chunk_overlap):
+    """Return (page_number, chunk) pairs of a PDF, chunked page by page"""
+    return [
+        (page_number, chunk)
+        for page_number, page in enumerate(extract_pdf_text(pdf_path), 1)
+        for chunk in chunk_text(page, chunk_size, chunk_overlap)
+    ]
+
+def chunk_pdf(pdf_path, chunk_size, chunk_overlap):
+    """Return the chunks of a PDF, chunked page by page"""
+    return [chunk for _, chunk in chunk_pdf_pages(pdf_path, chunk_size, chunk_overlap)]
@@ -0,0 +1,85 @@
+"""
+Context compaction for the retriever output passed between tasks.
+
+The retriever's verbose answer is split into sentences grouped by paragraph,
+near-duplicate sentences are dropped, and only the sentences most similar to
+the question are kept, in their original order, as "[c<paragraph>.<sentence>]
+snippet" lines. Every downstream task then reads the compact form instead of
+the raw prose.
+"""
+import re
+import numpy as np
+from .embeddings import embed_query, embed_texts
+from .instrumentation import current_trace
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+_QUESTION_IN_DESCRIPTION = re.compile(r"question: (.+?)\. ")
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4) if text else 0
+
+def split_sentences(text):
+    """Return (chunk_id, sentence) pairs, one chunk per paragraph"""
+    pieces = []
+    paragraphs = [paragraph for paragraph in re.split(r"\n\s*\n", text) if paragraph.strip()]
+    for p_index, paragraph in enumerate(paragraphs, 1):
+        lines = " ".join(line.strip(" -*\t") for line in paragraph.splitlines())
+        for s_index, sentence in enumerate(_SENTENCE_END.split(lines), 1):
+            if sentence.strip():
+                pieces.append((f"c{p_index}.{s_index}", sentence.strip()))
+    return pieces
+
+def compact_context(text, question, max_sentences=8, dedupe_threshold=0.95):
+    """Compact retrieved text to the sentences most relevant to the question.
+
+    Returns (compact_text, stats) where stats has the original and compact
+    token estimates and sentence counts.
+    """
+    pieces = split_sentences(text)
+    stats = {
+        "original_tokens": estimate_tokens(text),
+        "sentences": len(pieces),
+    }
+    if len(pieces) <= 1:
+        stats.update(compact_tokens=stats["original_tokens"], kept=len(pieces))
+        return text, stats
+
+    vectors = embed_texts([sentence for _, sentence in pieces])
+    keep = []
+    for index in np.argsort(-(vectors @ embed_query(question))):
+        if len(keep) == max_sentences:
+            break
+        if keep and float(np.max(vectors[keep] @ vectors[index])) >= dedupe_threshold:
+            continue
+        keep.append(int(index))
+
+    compact = "\n".join(f"[{pieces[index][0]}] {pieces[index][1]}" for index in sorted(keep))
+    stats.update(compact_tokens=estimate_tokens(compact), kept=len(keep))
+    return compact, stats
+
+def compaction_callback(consumers, max_sentences=8, then=None, agent="Retriever"):
+    """Crew task_callback that compacts the given agent's output in place.
+
+    consumers is the number of downstream tasks reading that output; the
+    tokens saved across all of them are recorded on the active query trace,
+    which also keeps the uncompacted text in case it becomes the final answer.
+    then is the task_callback to chain after compaction.
+    """
+    def callback(output):
+        if output.agent == agent:
+            trace = current_trace()
+            question = getattr(trace, "question", None)
+            if question is None:
+                match = _QUESTION_IN_DESCRIPTION.search(output.description or "")
+                question = match.group(1) if match else output.description
+            original = output.raw
+            compacted, stats = compact_context(original, question, max_sentences=max_sentences)
+            output.raw = compacted
+            stats["tokens_saved"] = (stats["original_tokens"] - stats["compact_tokens"]) * consumers
+            if trace is not None:
+                trace.uncompacted[compacted] = original
+                trace.compaction = stats
+        if then is not None:
+            then(output)
+    return callback
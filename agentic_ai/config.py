@@ -1,24 +1,178 @@
-from langchain_openai import ChatOpenAI
+import json
 import os
 
-def setup_llm():
-    """Setup and configure the LLM"""
-    groq_api_key = os.environ.get("GROQ_API_KEY")
+def verbose_enabled():
+    """Whether agents and crews log verbosely.
+
+    AGENTIC_AI_VERBOSE wins when set; otherwise verbose logging is on except
+    when AGENTIC_AI_ENV=production.
+    """
+    verbose = os.environ.get("AGENTIC_AI_VERBOSE")
+    if verbose is not None:
+        return verbose.lower() in ("1", "true", "yes")
+    return os.environ.get("AGENTIC_AI_ENV", "").lower() != "production"
+
+GROQ_API_BASE = "https://api.groq.com/openai/v1"
+GROQ_MODEL = "llama3-8b-8192"
+
+def create_chat_model(api_base, api_key, model, requests_per_second=None, callbacks=None, **options):
+    """ChatOpenAI client for an OpenAI-compatible endpoint, rate limited when requested"""
+    from langchain_openai import ChatOpenAI
+    
+    rate_limiter = None
+    if requests_per_second:
+        from langchain_core.rate_limiters import InMemoryRateLimiter
+        rate_limiter = InMemoryRateLimiter(
+            requests_per_second=requests_per_second,
+            check_every_n_seconds=0.05,
+            max_bucket_size=max(1, int(requests_per_second)),
+        )
+
+    return ChatOpenAI(
+        openai_api_base=api_base,
+        openai_api_key=api_key,
+        model_name=model,
+        temperature=options.pop("temperature", 0.1),
+        max_tokens=options.pop("max_tokens", 1000),
+        rate_limiter=rate_limiter,
+        callbacks=callbacks,
+        **options,
+    )
+
+def setup_llm(requests_per_second=None, api_base=None, api_key=None, model=None):
+    """Setup and configure the LLM.
+
+    requests_per_second (or GROQ_REQUESTS_PER_SECOND) installs a rate limiter
+    shared by every agent and crew copy using this LLM, so concurrent queries
+    queue for the Groq rate limit instead of failing with 429s.
+    api_base/api_key/model (or LLM_API_BASE/LLM_API_KEY/LLM_MODEL) point the
+    client at another OpenAI-compatible endpoint, e.g. a local stub server.
+    """
+    from .instrumentation import LLMCallHandler
+    
+    api_base = api_base or os.environ.get("LLM_API_BASE") or GROQ_API_BASE
+    groq_api_key = api_key or os.environ.get("LLM_API_KEY") or os.environ.get("GROQ_API_KEY")
     
     # Check if API key exists
     if not groq_api_key:
         raise ValueError("GROQ_API_KEY environment variable is not set. Please set it in your environment.")
 
-    llm = ChatOpenAI(
-        openai_api_base="https://api.groq.com/openai/v1",
-        openai_api_key=groq_api_key,
-        model_name="llama3-8b-8192",
-        temperature=0.1,
-        max_tokens=1000,
+    if requests_per_second is None and os.environ.get("GROQ_REQUESTS_PER_SECOND"):
+        requests_per_second = float(os.environ["GROQ_REQUESTS_PER_SECOND"])
+    
+    return create_chat_model(
+        api_base,
+        groq_api_key,
+        model or os.environ.get("LLM_MODEL") or GROQ_MODEL,
+        requests_per_second=requests_per_second,
+        callbacks=[LLMCallHandler()],
     )
+
+GROQ_LARGE_MODEL = "llama3-70b-8192"
+
+# Model tier per agent (keys of agents.create_agents) and the providers behind each tier
+DEFAULT_LLM_CONFIG = {
+    "providers": {
+        "groq": {
+            # LLM_API_BASE/LLM_API_KEY/LLM_MODEL override it as they do for setup_llm
+            "api_base": GROQ_API_BASE,
+            "api_base_env": "LLM_API_BASE",
+            "api_key_env": ["LLM_API_KEY", "GROQ_API_KEY"],
+            "requests_per_second_env": "GROQ_REQUESTS_PER_SECOND",
+        },
+        "fallback": {"api_base_env": "LLM_FALLBACK_API_BASE", "api_key_env": "LLM_FALLBACK_API_KEY"},
+    },
+    "tiers": {
+        "small": [
+            {"provider": "groq", "model": GROQ_MODEL, "model_env": "LLM_MODEL"},
+            {"provider": "fallback", "model": GROQ_MODEL, "model_env": "LLM_FALLBACK_SMALL_MODEL"},
+        ],
+        "large": [
+            {"provider": "groq", "model": GROQ_LARGE_MODEL, "model_env": "LLM_MODEL"},
+            {"provider": "fallback", "model": GROQ_LARGE_MODEL, "model_env": "LLM_FALLBACK_LARGE_MODEL"},
+        ],
+    },
+    "agents": {
+        "router": "small",
+        "grader": "small",
+        "hallucination_grader": "small",
+        "verification_grader": "small",
+        "retriever": "large",
+        "synthesizer": "large",
+        "answer_grader": "large",
+        "default": "large",
+    },
+}
+
+def _setting(options, key):
+    """A provider setting given directly or through the first set environment variable"""
+    names = options.get(f"{key}_env") or []
+    for name in [names] if isinstance(names, str) else names:
+        if os.environ.get(name):
+            return os.environ[name]
+    return options.get(key)
+
+def setup_llms(llm_config=None, pool_options=None):
+    """Build one ProviderPool per model tier and map every agent to its tier.
+
+    llm_config defaults to the JSON file named by AGENTIC_AI_LLM_CONFIG, or
+    DEFAULT_LLM_CONFIG: a small Groq model for the router and graders, a
+    large one for the retriever and the answer, each failing over to the
+    LLM_FALLBACK_API_BASE endpoint when that is set. Providers without an
+    api_base or api_key are skipped. Returns {agent name: llm}, including a
+    'default' entry, for create_rag_crew.
+    """
+    from .instrumentation import LLMCallHandler
+    from .providers import Provider, ProviderPool
     
+    if llm_config is None and os.environ.get("AGENTIC_AI_LLM_CONFIG"):
+        with open(os.environ["AGENTIC_AI_LLM_CONFIG"]) as file:
+            llm_config = json.load(file)
+    llm_config = llm_config or DEFAULT_LLM_CONFIG
+    
+    pools = {}
+    for tier, entries in llm_config["tiers"].items():
+        providers = []
+        for entry in entries:
+            options = llm_config["providers"][entry["provider"]]
+            api_base, api_key = _setting(options, "api_base"), _setting(options, "api_key")
+            if not api_base or not api_key:
+                continue
+            requests_per_second = _setting(options, "requests_per_second")
+            # The pool fails over itself, so the client does not retry
+            llm = create_chat_model(
+                api_base, api_key, _setting(entry, "model"),
+                requests_per_second=float(requests_per_second) if requests_per_second else None,
+                max_retries=options.get("max_retries", 0),
+                request_timeout=options.get("timeout_s", 60),
+            )
+            providers.append(Provider(f"{entry['provider']}:{_setting(entry, 'model')}", llm,
+                                      cooldown_s=options.get("cooldown_s", 10.0)))
+        if not providers:
+            raise ValueError(f"No provider of the '{tier}' LLM tier has an API base and key configured.")
+        pools[tier] = ProviderPool(providers=providers, callbacks=[LLMCallHandler()], **(pool_options or {}))
+    
+    return {agent: pools[tier] for agent, tier in llm_config["agents"].items()}
+
+def llm_pool_configured():
+    """Whether per-agent tiers or a fallback provider are configured (see setup_llms)"""
+    return bool(os.environ.get("AGENTIC_AI_LLM_CONFIG") or os.environ.get("LLM_FALLBACK_API_BASE"))
+
+def llm_for(llm, agent):
+    """The LLM for one agent from a single LLM or a setup_llms() mapping"""
+    if isinstance(llm, dict):
+        return llm.get(agent, llm.get("default"))
     return llm
 
+def llm_metrics(llm):
+    """Per-provider metrics of every ProviderPool in a setup_llms() mapping"""
+    pools = {id(pool): pool for pool in (llm.values() if isinstance(llm, dict) else [llm])}
+    metrics = {}
+    for pool in pools.values():
+        if hasattr(pool, "providers"):
+            metrics.update(pool.metrics())
+    return metrics
+
 def get_environment_variables():
     """Get all required environment variables"""
     return {
@@ -1,27 +1,168 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from crewai import Crew
 from .agents import create_agents
-from .tasks import create_tasks
+from .config import verbose_enabled
+from .instrumentation import current_trace, on_task_done, trace_query
+from .tasks import Verification, create_tasks, verification_passed
 
-def create_rag_crew(llm, rag_tool):
-    """Create the RAG crew with all agents and tasks"""
+def create_rag_crew(llm, rag_tool, prerouted=False, fused_verification=False, compact_context=False,
+                    llm_cache=None, uncached_agents=(), parallel_retrieval=False):
+    """Create the RAG crew with all agents and tasks.
+
+    llm is one LLM or a per-agent mapping from config.setup_llms. A
+    prerouted crew has no router task; pass a PreRouter to run_rag_query so
+    the route is decided before kickoff. fused_verification replaces the
+    grader and hallucination tasks with one structured verification call.
+    compact_context passes the retriever output to later tasks as compact
+    question-relevant snippets (see compaction.py). llm_cache memoizes the
+    agents' LLM calls except for uncached_agents (see agents.create_agents).
+    A parallel_retrieval crew answers from the {context} input instead of
+    routing and retrieving; use it through a ParallelRetrieval (see
+    parallel_retrieval.py).
+    """
     
     # Create agents
-    agents = create_agents(llm, rag_tool)
+    agents = create_agents(llm, rag_tool, llm_cache=llm_cache, uncached_agents=uncached_agents)
     
     # Create tasks
-    tasks = create_tasks(agents)
+    tasks = create_tasks(agents, prerouted=prerouted, fused_verification=fused_verification,
+                         parallel_retrieval=parallel_retrieval)
+    
+    task_callback = on_task_done
+    if compact_context:
+        from .compaction import compaction_callback
+        retriever_task = next(task for task in tasks if task.agent is agents['retriever'])
+        consumers = sum(retriever_task in (task.context or []) for task in tasks)
+        task_callback = compaction_callback(consumers, then=on_task_done)
     
     # Create crew
     rag_crew = Crew(
-        agents=list(agents.values()),
+        agents=[task.agent for task in tasks],
         tasks=tasks,
-        verbose=True,
+        verbose=verbose_enabled(),
+        task_callback=task_callback,
     )
     
     return rag_crew
 
-def run_rag_query(crew, question):
-    """Run a query through the RAG crew"""
+def plan_query(crew, question, trace, prerouter=None, parallel=None):
+    """Choose the crew and kickoff inputs for a question.
+
+    The PreRouter decides the route of a prerouted crew. With a
+    ParallelRetrieval, questions it cannot route locally (or every question,
+    with parallel.always) are answered by the parallel crew from both
+    sources instead. Returns (crew, inputs, decision).
+    """
     inputs = {"question": question}
-    result = crew.kickoff(inputs=inputs)
+    decision = None
+    if prerouter is not None and not (parallel is not None and parallel.always):
+        decision = prerouter.route(question, ask_llm=parallel is None)
+        trace.stage_done("pre-route", route=decision.route, method=decision.method)
+    if parallel is not None and (parallel.always or (decision is not None and decision.route is None)):
+        context, entries = parallel.retrieve(question)
+        trace.stage_done("parallel retrieval", results=len(entries))
+        return parallel.worker_crew(), {**inputs, "context": context}, decision
+    if decision is not None:
+        inputs["route"] = decision.route
+    return crew, inputs, decision
+
+def run_rag_query(crew, question, prerouter=None, cache=None, parallel=None):
+    """Run a query through the RAG crew.
+
+    With a SemanticCache, a near-duplicate of an earlier question returns the
+    stored answer without running the crew. With a ParallelRetrieval,
+    ambiguous questions search both sources at once (see plan_query). Every
+    call is traced (see instrumentation.add_sink for where the per-query
+    report goes).
+    """
+    with trace_query(question) as trace:
+        vector = None
+        if cache is not None:
+            index_version = cache.index_version
+            vector = cache.embed(question)
+            cached = cache.get(question, vector=vector)
+            if cached is not None:
+                trace.stage_done("semantic cache hit")
+                return cached
+        
+        crew, inputs, _ = plan_query(crew, question, trace, prerouter=prerouter, parallel=parallel)
+        result = final_answer(crew.kickoff(inputs=inputs))
+        
+        if cache is not None:
+            cache.put(question, result, vector=vector, index_version=index_version)
+        return result
+
+
+def final_answer(result):
+    """Resolve the answer of a fused-verification run whose answer task was skipped.
+
+    When the verification passes, the retriever output is the final answer
+    (restored to its uncompacted form if context compaction shortened it).
+    """
+    outputs = list(getattr(result, "tasks_output", None) or [])
+    for index, output in enumerate(outputs):
+        if isinstance(getattr(output, "pydantic", None), Verification) and index > 0:
+            if verification_passed(output):
+                raw = outputs[index - 1].raw
+                trace = current_trace()
+                if trace is not None:
+                    raw = trace.uncompacted.get(raw, raw)
+                return result.model_copy(update={"raw": raw, "pydantic": None, "json_dict": None})
+            break
     return result
+
+def is_rate_limit_error(error):
+    """Whether an exception looks like a provider rate-limit (HTTP 429) error"""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "rate_limit" in message
+
+def run_rag_batch(make_crew, questions, max_concurrency=4, prerouter=None, cache=None,
+                  max_retries=3, backoff_s=2.0, parallel=None):
+    """Run many questions concurrently, returning results in input order.
+
+    make_crew builds a fresh crew (e.g. functools.partial(create_rag_crew,
+    llm, rag_tool, ...)); every worker thread builds its own and reuses it
+    for its queries, so concurrent runs never share task outputs while the
+    LLM (and its rate limiter from setup_llm) stays shared. crew.copy() is
+    not used: it loses task context links, task subclasses and the LLM
+    callbacks. Rate-limit errors are retried with jittered exponential
+    backoff. Each result is a dict with question, result, error and
+    latency_s, retries and the trace summary.
+    """
+    local = threading.local()
+
+    def worker_crew():
+        if getattr(local, "crew", None) is None:
+            local.crew = make_crew()
+        return local.crew
+
+    def run_one(question):
+        start = time.perf_counter()
+        with trace_query(question) as trace:
+            for attempt in range(max_retries + 1):
+                trace.retries = attempt
+                try:
+                    result, error = run_rag_query(worker_crew(), question, prerouter=prerouter, cache=cache,
+                                                  parallel=parallel), None
+                    break
+                except Exception as e:
+                    result, error = None, e
+                    if attempt == max_retries or not is_rate_limit_error(e):
+                        break
+                    time.sleep(backoff_s * (2 ** attempt) * (1 + random.random()))
+        return {
+            "question": question,
+            "result": result,
+            "error": error,
+            "latency_s": time.perf_counter() - start,
+            "retries": trace.retries,
+            "summary": trace.summary(),
+        }
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        return list(executor.map(run_one, questions))
@@ -0,0 +1,370 @@
+"""
+Shared embedding service: one (optionally quantized) model per host.
+
+Worker processes send texts over a local Unix socket instead of each loading
+their own copy of bge-small. Requests arriving within max_wait_ms of each
+other are encoded as one micro-batch (up to max_batch texts, duplicates
+encoded once), and query strings are answered from an LRU cache when they
+repeat. Workers opt in with AGENTIC_AI_EMBEDDING_SOCKET (or
+embeddings.use_embedding_service), after which embed_texts/embed_query go
+through the service.
+
+    python -m agentic_ai.embedding_service --quantize int8 --max-wait-ms 2
+    AGENTIC_AI_EMBEDDING_SOCKET=/tmp/agentic_ai_embeddings.sock python -m agentic_ai.server
+
+Wire format: 4-byte big-endian length + payload frames. A request is one
+JSON frame; an embed reply is a JSON header frame with the shape followed by
+a frame of float32 bytes, anything else a single JSON frame.
+"""
+import argparse
+import json
+import os
+import queue
+import resource
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+import numpy as np
+from .embeddings import EMBEDDER_MODEL, QUANTIZE_MODES, get_embedding_model
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "agentic_ai_embeddings.sock")
+
+def _send_frame(sock, payload):
+    sock.sendall(struct.pack("!I", len(payload)) + payload)
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Embedding service connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+def _recv_frame(sock):
+    (size,) = struct.unpack("!I", _recv_exact(sock, 4))
+    return _recv_exact(sock, size)
+
+class EmbeddingService:
+    """Micro-batching, caching front of one embedding model.
+
+    embed() is thread-safe: concurrent calls are queued and a single batcher
+    thread encodes whatever arrived within max_wait_ms of the first waiting
+    request. Texts embedded with cache=True (query strings) are kept in an
+    LRU of cache_entries vectors; document chunks skip it. A call waits at
+    most timeout_s for its batch. quantize defaults to
+    AGENTIC_AI_EMBEDDING_QUANTIZE, like get_embedding_model.
+    """
+
+    def __init__(self, model_name=EMBEDDER_MODEL, quantize=None, max_batch=64, max_wait_ms=2.0,
+                 cache_entries=4096, timeout_s=60.0):
+        self.model_name = model_name
+        self.quantize = quantize or os.environ.get("AGENTIC_AI_EMBEDDING_QUANTIZE") or None
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000
+        self.cache_entries = cache_entries
+        self.timeout_s = timeout_s
+        self.model = None
+        self._queue = queue.Queue()
+        self._cache = OrderedDict()  # text -> vector
+        self._lock = threading.Lock()
+        self._thread = None
+        self._started_at = None
+        self._stats = {"requests": 0, "texts": 0, "batches": 0, "encoded": 0, "cache_hits": 0,
+                       "cache_misses": 0, "errors": 0}
+        self._encode_s = 0.0
+
+    def start(self):
+        """Load the model and start the batcher thread"""
+        if self._thread is None:
+            self.model = get_embedding_model(self.model_name, self.quantize)
+            self._started_at = time.perf_counter()
+            self._thread = threading.Thread(target=self._batch_loop, name="agentic-ai-embed-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join()
+
+    def _encode(self, texts):
+        vectors = self.model.encode(texts, batch_size=self.max_batch, normalize_embeddings=True,
+                                    convert_to_numpy=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _next_batch(self, first):
+        """The first request plus whatever joins it within max_wait_s, up to max_batch texts"""
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait_s
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _fail_pending(self):
+        """Fail requests still queued when the batcher stops"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item[1].set_exception(RuntimeError("Embedding service stopped"))
+
+    def _batch_loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._fail_pending()
+                return
+            batch = self._next_batch(first)
+            unique = list(dict.fromkeys(text for texts, _ in batch for text in texts))
+            start = time.perf_counter()
+            try:
+                vectors = dict(zip(unique, self._encode(unique)))
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["encoded"] += len(unique)
+                self._encode_s += time.perf_counter() - start
+            for texts, future in batch:
+                future.set_result([vectors[text] for text in texts])
+
+    def embed(self, texts, cache=False):
+        """L2-normalized float32 vectors of shape (len(texts), dim)"""
+        texts = list(texts)
+        found = {}
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["texts"] += len(texts)
+            if cache:
+                for text in texts:
+                    vector = self._cache.get(text)
+                    if vector is not None:
+                        self._cache.move_to_end(text)
+                        found[text] = vector
+                self._stats["cache_hits"] += len(found)
+                self._stats["cache_misses"] += len(texts) - len(found)
+        missing = [text for text in texts if text not in found]
+        if missing:
+            if self._thread is None or not self._thread.is_alive():
+                raise RuntimeError("Embedding service is not running")
+            future = Future()
+            self._queue.put((missing, future))
+            found.update(zip(missing, future.result(timeout=self.timeout_s)))
+            if cache:
+                with self._lock:
+                    for text in missing:
+                        self._cache[text] = found[text]
+                        self._cache.move_to_end(text)
+                    while len(self._cache) > self.cache_entries:
+                        self._cache.popitem(last=False)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[text] for text in texts])
+
+    def metrics(self):
+        """Batching, cache and throughput counters plus the service's peak RSS"""
+        with self._lock:
+            batches = self._stats["batches"]
+            uptime_s = time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+            return {
+                **self._stats,
+                "model": self.model_name,
+                "quantize": self.quantize,
+                "mean_batch_texts": self._stats["encoded"] / batches if batches else None,
+                "encode_s": self._encode_s,
+                "encoded_per_s": self._stats["encoded"] / self._encode_s if self._encode_s else None,
+                "texts_per_s": self._stats["texts"] / uptime_s if uptime_s else None,
+                "cache_entries": len(self._cache),
+                "queued": self._queue.qsize(),
+                "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            }
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        service = self.server.service
+        while True:
+            try:
+                frame = _recv_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                request = json.loads(frame)
+                op = request.get("op")
+                if op == "embed":
+                    model_name = request.get("model", service.model_name)
+                    if model_name != service.model_name:
+                        raise ValueError(f"This service embeds with {service.model_name}, not {model_name}")
+                    vectors = service.embed(request["texts"], cache=request.get("cache", False))
+                    _send_frame(self.request, json.dumps({"shape": vectors.shape, "model": service.model_name,
+                                                          "quantize": service.quantize}).encode())
+                    _send_frame(self.request, vectors.tobytes())
+                elif op == "metrics":
+                    _send_frame(self.request, json.dumps(service.metrics()).encode())
+                elif op == "ping":
+                    _send_frame(self.request, json.dumps({"model": service.model_name,
+                                                          "quantize": service.quantize}).encode())
+                else:
+                    raise ValueError(f"Unknown op {op!r}")
+            except Exception as e:
+                _send_frame(self.request, json.dumps({"error": f"Error: {e}"}).encode())
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 256  # every worker thread holds its own connection
+
+    def __init__(self, path, service):
+        self.service = service
+        if os.path.exists(path):
+            os.unlink(path)  # a stale socket from a previous run
+        super().__init__(path, _Handler)
+
+def serve(path=DEFAULT_SOCKET, service=None, background=False):
+    """Serve an EmbeddingService on a Unix socket; returns the server when background=True"""
+    server = EmbeddingServer(path, (service or EmbeddingService()).start())
+    if background:
+        threading.Thread(target=server.serve_forever, name="agentic-ai-embed-server", daemon=True).start()
+        return server
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+class EmbeddingClient:
+    """Client of an embedding service; one connection per calling thread.
+
+    With quantize given ('fp32' for none), replies from a service running
+    another quantize mode are rejected, since its vectors would not match
+    an index built with the expected one.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, timeout_s=60.0, quantize=None):
+        self.path = path
+        self.timeout_s = timeout_s
+        self.quantize = quantize
+        self.served = None  # (model, quantize) reported by the service
+        self._local = threading.local()
+        self._sockets = []
+        self._lock = threading.Lock()
+
+    def _socket(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout_s)
+            sock.connect(self.path)
+            self._local.sock = sock
+            with self._lock:
+                self._sockets.append(sock)
+        return sock
+
+    def _drop(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+            with self._lock:
+                self._sockets.remove(sock)
+
+    def _request(self, request):
+        payload = json.dumps(request).encode()
+        for attempt in range(2):
+            try:
+                sock = self._socket()
+                _send_frame(sock, payload)
+                reply = json.loads(_recv_frame(sock))
+                data = _recv_frame(sock) if "shape" in reply else None
+                break
+            except OSError:
+                # The service restarted or the connection broke: reconnect once
+                self._drop()
+                if attempt:
+                    raise
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        if "quantize" in reply:
+            served = reply["quantize"] or "fp32"
+            if self.quantize is not None and served != self.quantize:
+                raise RuntimeError(f"Embedding service runs quantize={served}, expected {self.quantize}")
+            self.served = (reply["model"], served)
+        return reply, data
+
+    def embed(self, texts, model_name=EMBEDDER_MODEL, cache=False):
+        """L2-normalized float32 vectors of shape (len(texts), dim)"""
+        reply, data = self._request({"op": "embed", "texts": list(texts), "model": model_name, "cache": cache})
+        return np.frombuffer(data, dtype=np.float32).reshape(reply["shape"])
+
+    def ping(self):
+        return self._request({"op": "ping"})[0]
+
+    def identity(self):
+        """'model:quantize' of the service, as recorded in the indexes it embeds for"""
+        if self.served is None:
+            self.ping()
+        return ":".join(self.served)
+
+    def wait(self, timeout_s=120.0):
+        """Block until the service answers (it may still be loading its model)"""
+        deadline = time.monotonic() + timeout_s
+        while True:
+            try:
+                return self.ping()
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+    def metrics(self):
+        return self._request({"op": "metrics"})[0]
+
+    def close(self):
+        with self._lock:
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            sock.close()
+        self._local = threading.local()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the embedding model to local worker processes")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--model", default=EMBEDDER_MODEL)
+    parser.add_argument("--quantize", choices=QUANTIZE_MODES, default=None)
+    parser.add_argument("--max-batch", type=int, default=64, help="Most texts encoded in one batch")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0,
+                        help="How long a request waits for others to batch with")
+    parser.add_argument("--cache-entries", type=int, default=4096, help="Query vectors kept in the LRU cache")
+    parser.add_argument("--timeout-s", type=float, default=60.0, help="Longest a request waits for its batch")
+    args = parser.parse_args()
+    service = EmbeddingService(args.model, args.quantize, max_batch=args.max_batch,
+                               max_wait_ms=args.max_wait_ms, cache_entries=args.cache_entries,
+                               timeout_s=args.timeout_s)
+    print(f"Serving {args.model} ({service.quantize or 'fp32'}) on {args.socket}")
+    serve(args.socket, service)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import os
+import threading
+import numpy as np
+
+EMBEDDER_MODEL = "BAAI/bge-small-en-v1.5"
+QUANTIZE_MODES = ("int8", "onnx", "onnx-int8")
+
+_models = {}
+_lock = threading.Lock()
+_service_client = None
+
+def _onnx_int8_model(model_name):
+    """bge-small exported to ONNX with dynamically quantized int8 weights, built once in the cache dir"""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+    from .pdf_cache import DEFAULT_CACHE_DIR
+    export_dir = os.path.join(DEFAULT_CACHE_DIR, "onnx", model_name.replace("/", "--"))
+    file_name = "onnx/model_qint8_avx2.onnx"
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        model = SentenceTransformer(model_name, backend="onnx", device="cpu")
+        model.save(export_dir)
+        export_dynamic_quantized_onnx_model(model, "avx2", export_dir)
+    return SentenceTransformer(export_dir, backend="onnx", device="cpu", model_kwargs={"file_name": file_name})
+
+def load_embedding_model(model_name=EMBEDDER_MODEL, quantize=None):
+    """Load a sentence-transformers model, optionally quantized for CPU inference.
+
+    quantize='int8' applies PyTorch dynamic int8 quantization to the linear
+    layers; 'onnx' runs the model on ONNX Runtime and 'onnx-int8' on an int8
+    ONNX export (both need optimum[onnxruntime]).
+    """
+    from sentence_transformers import SentenceTransformer
+    if quantize not in (None, *QUANTIZE_MODES):
+        raise ValueError(f"Unknown quantize mode {quantize!r}, expected one of {QUANTIZE_MODES}")
+    if quantize == "onnx-int8":
+        return _onnx_int8_model(model_name)
+    if quantize == "onnx":
+        return SentenceTransformer(model_name, backend="onnx", device="cpu")
+    if quantize == "int8":
+        import torch
+        model = SentenceTransformer(model_name, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return SentenceTransformer(model_name)
+
+def get_embedding_model(model_name=EMBEDDER_MODEL, quantize=None):
+    """Load a sentence-transformers model once per process.
+
+    quantize defaults to AGENTIC_AI_EMBEDDING_QUANTIZE (see load_embedding_model).
+    """
+    quantize = quantize or os.environ.get("AGENTIC_AI_EMBEDDING_QUANTIZE") or None
+    with _lock:
+        if (model_name, quantize) not in _models:
+            _models[model_name, quantize] = load_embedding_model(model_name, quantize)
+        return _models[model_name, quantize]
+
+def use_embedding_service(path=None):
+    """Send this process's embeddings to a shared embedding service (see embedding_service.py).
+
+    path defaults to AGENTIC_AI_EMBEDDING_SOCKET; None there too switches
+    back to the in-process model. Returns the client or None.
+    """
+    global _service_client
+    path = path or os.environ.get("AGENTIC_AI_EMBEDDING_SOCKET")
+    with _lock:
+        if _service_client is not None:
+            _service_client.close()
+        _service_client = None
+        if path:
+            from .embedding_service import EmbeddingClient
+            # A process that names a quantize mode only accepts a service running it
+            _service_client = EmbeddingClient(path, quantize=os.environ.get("AGENTIC_AI_EMBEDDING_QUANTIZE") or None)
+        return _service_client
+
+def get_embedding_service():
+    """The embedding service client in use, if any"""
+    return _service_client
+
+def embedder_identity(model_name=EMBEDDER_MODEL):
+    """'model:quantize' of the embedder this process uses; indexes record it at ingest"""
+    if _service_client is not None:
+        return _service_client.identity()
+    return f"{model_name}:{os.environ.get('AGENTIC_AI_EMBEDDING_QUANTIZE') or 'fp32'}"
+
+def preload_embeddings(model_name=EMBEDDER_MODEL):
+    """Load the in-process model, or check that the embedding service answers"""
+    if _service_client is not None:
+        return _service_client.ping()
+    return get_embedding_model(model_name)
+
+def embed_texts(texts, model_name=EMBEDDER_MODEL, batch_size=64):
+    """Embed texts into L2-normalized float32 vectors of shape (len(texts), dim)"""
+    if _service_client is not None:
+        return _service_client.embed(list(texts), model_name=model_name)
+    model = get_embedding_model(model_name)
+    vectors = model.encode(
+        list(texts),
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    return np.asarray(vectors, dtype=np.float32)
+
+def embed_query(text, model_name=EMBEDDER_MODEL):
+    """Embed a single query string into a normalized float32 vector"""
+    if _service_client is not None:
+        return _service_client.embed([text], model_name=model_name, cache=True)[0]
+    return embed_texts([text], model_name=model_name)[0]
+
+if os.environ.get("AGENTIC_AI_EMBEDDING_SOCKET"):
+    use_embedding_service()
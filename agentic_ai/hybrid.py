@@ -0,0 +1,184 @@
+"""
+Hybrid BM25 + dense retrieval with reciprocal rank fusion.
+
+An inverted BM25 index is kept next to a dense retrieval backend so exact
+technical terms ("multi-head", "positional encoding") are found even when
+the embedding misses them. Both rankings are fused with reciprocal rank
+fusion, and the fused top-N can optionally be reranked by a small local
+cross-encoder.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any
+from .embeddings import embed_query
+from .instrumentation import tool_span
+from .retrieval import DEFAULT_TOP_K, CorpusSearchTool, format_hits, open_backend
+
+BM25_NAME = "bm25.json"
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+_TOKEN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+def tokenize(text):
+    """Lowercase terms; hyphenated terms also yield their parts"""
+    tokens = []
+    for term in _TOKEN.findall(text.lower()):
+        tokens.append(term)
+        if "-" in term:
+            tokens.extend(term.split("-"))
+    return tokens
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring"""
+
+    def __init__(self, documents, metadatas, k1=1.5, b=0.75, fingerprint=None):
+        self.documents = list(documents)
+        self.metadatas = list(metadatas)
+        self.k1 = k1
+        self.b = b
+        self.fingerprint = fingerprint
+        self.postings = defaultdict(dict)  # term -> {row: term frequency}
+        self.lengths = []
+        for row, document in enumerate(self.documents):
+            counts = Counter(tokenize(document))
+            self.lengths.append(sum(counts.values()))
+            for term, frequency in counts.items():
+                self.postings[term][row] = frequency
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def __len__(self):
+        return len(self.documents)
+
+    def idf(self, term):
+        frequency = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.documents) - frequency + 0.5) / (frequency + 0.5))
+
+    def search(self, query, k=DEFAULT_TOP_K):
+        """Top-k (score, document, metadata) by BM25"""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for row, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[row] / self.average_length)
+                scores[row] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(score, self.documents[row], self.metadatas[row]) for row, score in top]
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"documents": self.documents, "metadatas": self.metadatas,
+                       "k1": self.k1, "b": self.b, "fingerprint": self.fingerprint}, file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            data = json.load(file)
+        return cls(data["documents"], data["metadatas"], k1=data["k1"], b=data["b"],
+                   fingerprint=data.get("fingerprint"))
+
+def corpus_fingerprint(index_dir, backend):
+    """Hash of the indexed content: the ingest state's file hashes, or the documents themselves"""
+    from .ingest import load_state
+    files = load_state(index_dir)["files"]
+    digest = hashlib.sha256()
+    if files:
+        for path, entry in sorted(files.items()):
+            digest.update(f"{path}\0{entry.get('sha256')}\0{entry.get('n_chunks')}\n".encode())
+    else:
+        for document, metadata in backend.iter_documents():
+            digest.update(f"{metadata.get('source')}\0{metadata.get('chunk')}\0{document}\n".encode())
+    return f"{backend.count()}-{digest.hexdigest()}"
+
+def load_or_build_bm25(index_dir, backend):
+    """Load the BM25 index stored with a backend, rebuilding it when the indexed content changed"""
+    path = os.path.join(index_dir, BM25_NAME)
+    fingerprint = corpus_fingerprint(index_dir, backend)
+    if os.path.exists(path):
+        bm25 = BM25Index.load(path)
+        if bm25.fingerprint == fingerprint:
+            return bm25
+    documents = backend.iter_documents()
+    bm25 = BM25Index([document for document, _ in documents], [metadata for _, metadata in documents],
+                     fingerprint=fingerprint)
+    bm25.save(path)
+    return bm25
+
+def _hit_key(document, metadata):
+    if "source" in metadata and "chunk" in metadata:
+        return (metadata["source"], metadata["chunk"])
+    return document
+
+def reciprocal_rank_fusion(rankings, rrf_k=60):
+    """Fuse ranked hit lists; returns (fused_score, document, metadata) best first"""
+    fused = {}
+    for hits in rankings:
+        for rank, (_, document, metadata) in enumerate(hits, 1):
+            key = _hit_key(document, metadata)
+            score, _, _ = fused.get(key, (0.0, document, metadata))
+            fused[key] = (score + 1.0 / (rrf_k + rank), document, metadata)
+    return sorted(fused.values(), key=lambda hit: hit[0], reverse=True)
+
+_rerankers = {}
+_reranker_lock = threading.Lock()
+
+def get_reranker(model_name=RERANKER_MODEL):
+    """Load a sentence-transformers cross-encoder once per process"""
+    with _reranker_lock:
+        if model_name not in _rerankers:
+            from sentence_transformers import CrossEncoder
+            _rerankers[model_name] = CrossEncoder(model_name)
+        return _rerankers[model_name]
+
+class HybridRetriever:
+    """Dense backend + BM25, fused with RRF and optionally reranked"""
+
+    def __init__(self, backend, bm25, candidates=20, rrf_k=60, rerank=False, rerank_top_n=10,
+                 reranker_model=RERANKER_MODEL):
+        self.backend = backend
+        self.bm25 = bm25
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.rerank = rerank
+        self.rerank_top_n = rerank_top_n
+        self.reranker_model = reranker_model
+
+    def search(self, query, k=DEFAULT_TOP_K):
+        dense = self.backend.search(embed_query(query), self.candidates)
+        sparse = self.bm25.search(query, self.candidates)
+        fused = reciprocal_rank_fusion([dense, sparse], self.rrf_k)
+        if self.rerank and fused:
+            top = fused[:self.rerank_top_n]
+            scores = get_reranker(self.reranker_model).predict([(query, document) for _, document, _ in top])
+            fused = sorted(
+                ((float(score), document, metadata) for score, (_, document, metadata) in zip(scores, top)),
+                key=lambda hit: hit[0], reverse=True,
+            ) + fused[self.rerank_top_n:]
+        return fused[:k]
+
+class HybridSearchTool(CorpusSearchTool):
+    description: str = (
+        "A tool that searches the content of every indexed PDF document, "
+        "matching both exact technical terms and meaning."
+    )
+    retriever: Any = None
+
+    def _run(self, query: str, **kwargs: Any) -> str:
+        with tool_span("rag_tool"):
+            return format_hits(self.retriever.search(query, self.top_k))
+
+def setup_hybrid(index_dir, top_k=DEFAULT_TOP_K, backend="numpy", rerank=False, **kwargs):
+    """Build a hybrid search tool over a corpus index written by agentic_ai.ingest"""
+    from .ingest import check_embedder
+    check_embedder(index_dir)
+    dense = open_backend(index_dir, backend)
+    retriever = HybridRetriever(dense, load_or_build_bm25(index_dir, dense), rerank=rerank, **kwargs)
+    return HybridSearchTool(backend=dense, retriever=retriever, top_k=top_k)
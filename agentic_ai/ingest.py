@@ -0,0 +1,218 @@
+"""
+Multi-document ingestion into a single shared corpus index.
+
+PDFs are parsed and chunked in a process pool, chunks are embedded in large
+batches and written incrementally. Progress is recorded per file, so an
+interrupted run resumes where it stopped and unchanged files are skipped.
+When a file changes, only chunks whose text is new are embedded; the others
+reuse the embeddings already in the index.
+
+    python -m agentic_ai.ingest papers/ --index-dir ~/.cache/agentic_ai/corpus
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .chunking import CHUNK_OVERLAP, CHUNK_SIZE, chunk_pdf_pages
+from .embeddings import embed_texts, embedder_identity
+from .pdf_cache import file_sha256
+from .retrieval import open_backend
+
+STATE_NAME = "ingest_state.json"
+
+logger = logging.getLogger(__name__)
+
+def discover_pdfs(source):
+    """List PDFs from a list of paths, a directory (recursively) or a manifest file.
+
+    A manifest is either a JSON list of paths or a text file with one path
+    per line; relative paths are resolved against the manifest's directory.
+    """
+    if isinstance(source, (list, tuple)):
+        return list(source)
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(source)
+            for name in names
+            if name.lower().endswith(".pdf")
+        )
+    with open(source) as file:
+        text = file.read()
+    try:
+        paths = json.loads(text)
+    except ValueError:
+        paths = [line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#")]
+    base = os.path.dirname(os.path.abspath(source))
+    return [path if os.path.isabs(path) else os.path.join(base, path) for path in paths]
+
+def load_state(index_dir):
+    """Load per-file ingestion progress"""
+    path = os.path.join(index_dir, STATE_NAME)
+    if not os.path.exists(path):
+        return {"files": {}}
+    with open(path) as file:
+        return json.load(file)
+
+def check_embedder(index_dir):
+    """The embedder identity of this process, checked against the one the index was built with.
+
+    Raises ValueError when they differ (another model, or fp32 vs int8/ONNX),
+    since query vectors would not be comparable with the stored ones.
+    """
+    recorded = load_state(index_dir).get("embedder")
+    current = embedder_identity()
+    if recorded is not None and recorded != current:
+        raise ValueError(f"{index_dir} was embedded with {recorded} but this process embeds with {current}; "
+                         f"rebuild the index or use the same embedder")
+    return current
+
+def save_state(index_dir, state):
+    """Atomically write per-file ingestion progress"""
+    path = os.path.join(index_dir, STATE_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(state, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def parse_pdf(path, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
+    """Hash, parse and chunk one PDF (runs in a worker process)"""
+    sha256 = file_sha256(path)
+    pages = chunk_pdf_pages(path, chunk_size, chunk_overlap)
+    return {
+        "path": path,
+        "sha256": sha256,
+        "n_pages": max((page for page, _ in pages), default=0),
+        "chunks": pages,
+    }
+
+def chunk_ids(source_path, sha256, count):
+    """Chunk ids unique per source path, so identical PDFs at two paths do not collide"""
+    path_hash = hashlib.sha256(source_path.encode()).hexdigest()[:8]
+    return [f"{path_hash}-{sha256[:16]}-{i}" for i in range(count)]
+
+def ingest(source, index_dir, backend="chroma", workers=None, batch_size=512,
+           chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, remove_missing=False):
+    """Ingest every PDF under source into the index at index_dir.
+
+    backend is a backend name from retrieval.BACKENDS or an opened backend.
+    remove_missing deletes previously ingested files that are no longer in
+    source, so source describes the whole corpus. A file is skipped only
+    when its contents and the chunking parameters are unchanged since it was
+    ingested. Returns throughput statistics for the run; files that could not
+    be parsed are listed in failed_paths.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    if isinstance(backend, str):
+        backend = open_backend(index_dir, backend)
+    state = load_state(index_dir)
+    state["embedder"] = check_embedder(index_dir)
+    start = time.perf_counter()
+    stats = {"files": 0, "skipped": 0, "failed": 0, "removed": 0, "pages": 0, "chunks": 0,
+             "embedded_chunks": 0, "reused_chunks": 0, "failed_paths": []}
+    chunking = [chunk_size, chunk_overlap]
+
+    paths = discover_pdfs(source)
+    if remove_missing:
+        wanted = {os.path.abspath(path) for path in paths}
+        for source_path in [path for path in state["files"] if path not in wanted]:
+            backend.delete_source(source_path)
+            del state["files"][source_path]
+            stats["removed"] += 1
+        if stats["removed"]:
+            save_state(index_dir, state)
+    pending = []
+    for path in paths:
+        entry = state["files"].get(os.path.abspath(path))
+        if (entry and entry.get("done") and entry.get("chunking") == chunking
+                and entry.get("sha256") == file_sha256(path)):
+            stats["skipped"] += 1
+        else:
+            pending.append(path)
+
+    buffered = []  # parsed files waiting for a full embedding batch
+
+    def flush():
+        # Embeddings of changed files' unchanged chunks are reused, keyed by chunk text
+        known = {}
+        for parsed in buffered:
+            source_path = os.path.abspath(parsed["path"])
+            if source_path in state["files"]:
+                known.update(backend.source_embeddings(source_path))
+        documents = list(dict.fromkeys(
+            chunk for parsed in buffered for _, chunk in parsed["chunks"] if chunk not in known
+        ))
+        if documents:
+            known.update(zip(documents, embed_texts(documents, batch_size=min(batch_size, 256))))
+        stats["embedded_chunks"] += len(documents)
+        for parsed in buffered:
+            source_path = os.path.abspath(parsed["path"])
+            count = len(parsed["chunks"])
+            if source_path in state["files"]:
+                backend.delete_source(source_path)
+            if count:
+                backend.add(
+                    chunk_ids(source_path, parsed["sha256"], count),
+                    np.stack([known[chunk] for _, chunk in parsed["chunks"]]),
+                    [chunk for _, chunk in parsed["chunks"]],
+                    [{"source": source_path, "page": page, "chunk": i}
+                     for i, (page, _) in enumerate(parsed["chunks"])],
+                )
+            state["files"][source_path] = {
+                "sha256": parsed["sha256"],
+                "n_chunks": count,
+                "n_pages": parsed["n_pages"],
+                "chunking": chunking,
+                "done": True,
+            }
+            stats["files"] += 1
+            stats["pages"] += parsed["n_pages"]
+            stats["chunks"] += count
+        stats["reused_chunks"] = stats["chunks"] - stats["embedded_chunks"]
+        save_state(index_dir, state)
+        buffered.clear()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(parse_pdf, path, chunk_size, chunk_overlap): path for path in pending}
+        for future in as_completed(futures):
+            try:
+                buffered.append(future.result())
+            except Exception as e:
+                stats["failed"] += 1
+                stats["failed_paths"].append(futures[future])
+                logger.warning("Failed to ingest %s: %s", futures[future], e)
+                continue
+            if sum(len(parsed["chunks"]) for parsed in buffered) >= batch_size:
+                flush()
+        if buffered:
+            flush()
+
+    elapsed_s = time.perf_counter() - start
+    stats["elapsed_s"] = elapsed_s
+    stats["pages_per_s"] = stats["pages"] / elapsed_s if elapsed_s else 0.0
+    stats["chunks_per_s"] = stats["chunks"] / elapsed_s if elapsed_s else 0.0
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest PDFs into the shared corpus index")
+    parser.add_argument("source", help="Directory of PDFs or manifest file")
+    parser.add_argument("--index-dir", required=True)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--backend", choices=["chroma", "numpy"], default="chroma")
+    parser.add_argument("--quantize", action="store_true", help="Store int8 embeddings (numpy backend)")
+    parser.add_argument("--ivf", action="store_true", help="Build an IVF index after ingesting (numpy backend)")
+    args = parser.parse_args()
+    options = {"quantize": True} if args.quantize else {}
+    backend = open_backend(args.index_dir, args.backend, **options)
+    stats = ingest(args.source, args.index_dir, backend=backend, workers=args.workers, batch_size=args.batch_size)
+    if args.ivf:
+        backend.build_ivf()
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Per-query latency and token instrumentation for the crew pipeline.
+
+A QueryTrace is bound to the current context while run_rag_query runs. The
+LLM callback handler installed by setup_llm, the instrumented tools and the
+crew's task callback all record into whichever trace is active, so concurrent
+queries on different threads never mix. Completed traces are exported as
+OpenTelemetry-shaped spans to pluggable sinks.
+"""
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar("agentic_ai_trace", default=None)
+
+def _span_id():
+    return os.urandom(8).hex()
+
+class QueryTrace:
+    """Spans and counters collected for one query"""
+
+    def __init__(self, question):
+        self.question = question
+        self.trace_id = os.urandom(16).hex()
+        self.span_id = _span_id()
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.spans = []
+        self.retries = 0
+        self.llm_errors = 0
+        self.compaction = None
+        self.uncompacted = {}  # compacted text -> original text
+        self._task_start_ns = self.start_ns
+        self._task = {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._llm_starts = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name, kind, start_ns, end_ns, **attributes):
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "kind": kind,
+                "trace_id": self.trace_id,
+                "span_id": _span_id(),
+                "parent_span_id": self.span_id,
+                "start_time_unix_nano": start_ns,
+                "end_time_unix_nano": end_ns,
+                "attributes": attributes,
+            })
+
+    def llm_start(self, run_id):
+        self._llm_starts[run_id] = time.time_ns()
+
+    def llm_end(self, run_id, token_usage, model):
+        end_ns = time.time_ns()
+        start_ns = self._llm_starts.pop(run_id, end_ns)
+        prompt_tokens = token_usage.get("prompt_tokens", 0)
+        completion_tokens = token_usage.get("completion_tokens", 0)
+        with self._lock:
+            self._task["llm_calls"] += 1
+            self._task["prompt_tokens"] += prompt_tokens
+            self._task["completion_tokens"] += completion_tokens
+        self.add_span("llm", "llm", start_ns, end_ns, model=model,
+                      prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def llm_error(self, run_id):
+        self._llm_starts.pop(run_id, None)
+        with self._lock:
+            self.llm_errors += 1
+
+    def stage_done(self, name, **attributes):
+        """Close the running stage; stages run sequentially so it started when the previous one ended"""
+        end_ns = time.time_ns()
+        with self._lock:
+            counters, self._task = self._task, {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+            start_ns, self._task_start_ns = self._task_start_ns, end_ns
+        self.add_span(name, "task", start_ns, end_ns, **attributes, **counters)
+
+    def task_done(self, output):
+        """Close the running crew task from its TaskOutput"""
+        agent = getattr(output, "agent", "") or ""
+        self.stage_done(getattr(output, "name", None) or agent or "task", agent=agent)
+
+    def finish(self):
+        self.end_ns = time.time_ns()
+
+    def summary(self):
+        """Per-task wall time, LLM calls and tokens, tool latency and totals"""
+        def seconds(span):
+            return (span["end_time_unix_nano"] - span["start_time_unix_nano"]) / 1e9
+
+        tasks = [
+            {"task": span["name"], "wall_s": seconds(span), **{
+                key: span["attributes"][key] for key in ("llm_calls", "prompt_tokens", "completion_tokens")
+            }}
+            for span in self.spans if span["kind"] == "task"
+        ]
+        tools = {}
+        for span in self.spans:
+            if span["kind"] == "tool":
+                tool = tools.setdefault(span["name"], {"calls": 0, "total_s": 0.0})
+                tool["calls"] += 1
+                tool["total_s"] += seconds(span)
+        llm_spans = [span for span in self.spans if span["kind"] == "llm"]
+        total_s = ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+        return {
+            "question": self.question,
+            "total_s": total_s,
+            "llm_calls": len(llm_spans),
+            "prompt_tokens": sum(span["attributes"]["prompt_tokens"] for span in llm_spans),
+            "completion_tokens": sum(span["attributes"]["completion_tokens"] for span in llm_spans),
+            "retries": self.retries,
+            "llm_errors": self.llm_errors,
+            "context_tokens_saved": self.compaction["tokens_saved"] if self.compaction else 0,
+            "tasks": tasks,
+            "tools": tools,
+            "slowest_task": max(tasks, key=lambda task: task["wall_s"])["task"] if tasks else None,
+            "costliest_task": (
+                max(tasks, key=lambda task: task["prompt_tokens"] + task["completion_tokens"])["task"]
+                if tasks else None
+            ),
+        }
+
+    def to_spans(self):
+        """All spans, with the root query span first"""
+        root = {
+            "name": "run_rag_query",
+            "kind": "query",
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": None,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns or time.time_ns(),
+            "attributes": {"question": self.question, "retries": self.retries},
+        }
+        return [root] + list(self.spans)
+
+def format_summary(summary):
+    """Render a trace summary as a small text table"""
+    lines = [
+        f"Query: {summary['question']}",
+        f"Total {summary['total_s']:.2f}s, {summary['llm_calls']} LLM calls, "
+        f"{summary['prompt_tokens']} prompt + {summary['completion_tokens']} completion tokens",
+        f"{'task':<40} {'wall_s':>8} {'calls':>6} {'prompt':>8} {'compl':>8}",
+    ]
+    for task in summary["tasks"]:
+        lines.append(
+            f"{task['task'][:40]:<40} {task['wall_s']:>8.2f} {task['llm_calls']:>6} "
+            f"{task['prompt_tokens']:>8} {task['completion_tokens']:>8}"
+        )
+    for name, tool in summary["tools"].items():
+        lines.append(f"tool {name}: {tool['calls']} calls, {tool['total_s']:.2f}s")
+    lines.append(f"Slowest task: {summary['slowest_task']}; costliest task: {summary['costliest_task']}")
+    return "\n".join(lines)
+
+class InMemorySink:
+    """Keep completed traces in memory (handy for benchmarks)"""
+
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+class ReportSink:
+    """Print a per-query summary table"""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def export(self, trace):
+        print(format_summary(trace.summary()), file=self.stream or sys.stdout)
+
+class LoggingSink:
+    """Log each trace summary as one JSON line"""
+
+    def __init__(self, level=logging.INFO):
+        self.level = level
+
+    def export(self, trace):
+        logger.log(self.level, json.dumps(trace.summary()))
+
+class OpenTelemetrySink:
+    """Re-emit trace spans through an OpenTelemetry tracer"""
+
+    def __init__(self, tracer=None):
+        from opentelemetry import trace
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("agentic_ai")
+
+    def export(self, trace):
+        root, *children = trace.to_spans()
+        parent = self.tracer.start_span(root["name"], start_time=root["start_time_unix_nano"],
+                                        attributes=root["attributes"])
+        context = self._trace.set_span_in_context(parent)
+        for span in children:
+            attributes = {"kind": span["kind"], **{
+                key: value for key, value in span["attributes"].items() if value is not None
+            }}
+            child = self.tracer.start_span(span["name"], context=context,
+                                           start_time=span["start_time_unix_nano"], attributes=attributes)
+            child.end(end_time=span["end_time_unix_nano"])
+        parent.end(end_time=root["end_time_unix_nano"])
+
+_sinks = []
+
+def add_sink(sink):
+    """Register a sink that receives every completed trace"""
+    _sinks.append(sink)
+
+def remove_sink(sink):
+    _sinks.remove(sink)
+
+def current_trace():
+    return _current_trace.get()
+
+def export_trace(trace):
+    """Finish a trace and hand it to every registered sink"""
+    trace.finish()
+    for sink in list(_sinks):
+        try:
+            sink.export(trace)
+        except Exception:
+            logger.exception("Failed to export trace")
+
+@contextmanager
+def activate(trace):
+    """Make trace the active trace of the current context"""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+@contextmanager
+def trace_query(question):
+    """Trace a query and export it when done; nested calls reuse the outer trace"""
+    trace = _current_trace.get()
+    if trace is not None:
+        yield trace
+        return
+    trace = QueryTrace(question)
+    try:
+        with activate(trace):
+            yield trace
+    finally:
+        export_trace(trace)
+
+@contextmanager
+def tool_span(name):
+    """Time a tool call into the active trace, if any"""
+    start_ns = time.time_ns()
+    try:
+        yield
+    finally:
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span(name, "tool", start_ns, time.time_ns())
+
+def on_task_done(output):
+    """Crew task_callback that closes the running task of the active trace"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.task_done(output)
+
+class LLMCallHandler(BaseCallbackHandler):
+    """LangChain callback recording LLM calls and token usage into the active trace.
+
+    Pass a trace to record into it regardless of context, e.g. when a stream
+    is consumed outside the thread that traced the query.
+    """
+
+    def __init__(self, trace=None):
+        self.trace = trace
+
+    def _active(self):
+        return self.trace or _current_trace.get()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        trace = self._active()
+        if trace is not None:
+            trace.llm_start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        trace = self._active()
+        if trace is not None:
+            trace.llm_start(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        trace = self._active()
+        if trace is not None:
+            llm_output = response.llm_output or {}
+            trace.llm_end(run_id, llm_output.get("token_usage") or {}, llm_output.get("model_name", ""))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        trace = self._active()
+        if trace is not None:
+            trace.llm_error(run_id)
@@ -0,0 +1,243 @@
+"""
+Versioned corpus snapshots with atomic hot-swap of the retrieval backend.
+
+Each update clones the published snapshot into a new version directory,
+applies the incremental ingest there (only new chunk text is embedded) and
+then publishes it by atomically rewriting the CURRENT file and swapping the
+backend reference. A LiveIndex passes for a backend, so the Retriever
+agent's CorpusSearchTool keeps working across updates: every search runs on
+one complete snapshot, in-flight searches finish on the one they started on,
+and the crew is never rebuilt.
+
+For the numpy backend the clone hard-links the append-only data files, so
+an update costs O(changed documents) rather than O(corpus), and snapshots
+whose deleted (replaced) rows pass compact_ratio are compacted before they
+are published. Swap listeners (on_swap) refresh whatever derives from the
+index, such as the hybrid BM25 index or the semantic answer cache.
+
+    root/
+        CURRENT          name of the published version
+        versions/v000001 a full index directory (backend files + ingest state)
+
+    python -m agentic_ai.live_index papers/ --root corpus_live
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+from .hybrid import BM25_NAME
+from .ingest import check_embedder, ingest
+from .retrieval import DEFAULT_TOP_K, CorpusSearchTool, NumpyBackend, open_backend
+
+CURRENT_NAME = "CURRENT"
+VERSIONS_DIR = "versions"
+# Files a new snapshot may share with the previous one: appended to, or only ever replaced whole
+LINKED_FILES = NumpyBackend.APPEND_ONLY_FILES + (BM25_NAME,)
+
+class LiveIndex:
+    """A retrieval backend whose snapshot can be replaced while it serves queries.
+
+    Other processes serving the same root pick up a published version within
+    refresh_interval_s of their next search (None disables the check);
+    keep_versions old snapshots stay on disk for readers still switching.
+    A numpy snapshot is compacted once more than compact_ratio of its rows
+    are deleted. Updates are meant to come from one process at a time.
+    """
+
+    def __init__(self, root, backend="numpy", keep_versions=3, refresh_interval_s=5.0, compact_ratio=0.25,
+                 **backend_options):
+        self.root = root
+        self.backend_name = backend
+        self.backend_options = backend_options
+        self.keep_versions = max(2, keep_versions)
+        self.refresh_interval_s = refresh_interval_s
+        self.compact_ratio = compact_ratio
+        self._listeners = []
+        self.version = None
+        self.backend = None
+        self.last_update = None
+        self._checked_at = time.monotonic()
+        self._update_lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        os.makedirs(os.path.join(root, VERSIONS_DIR), exist_ok=True)
+        self.refresh()
+
+    def _version_dir(self, version):
+        return os.path.join(self.root, VERSIONS_DIR, version)
+
+    def _published_version(self):
+        path = os.path.join(self.root, CURRENT_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            return file.read().strip() or None
+
+    def _publish(self, version):
+        path = os.path.join(self.root, CURRENT_NAME)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            file.write(version)
+        os.replace(tmp_path, path)
+
+    def on_swap(self, listener):
+        """Call listener(version, index_dir, backend) on every swap, and now if a version is in use"""
+        self._listeners.append(listener)
+        if self.version is not None:
+            listener(self.version, self._version_dir(self.version), self.backend)
+
+    def _swap(self, version, backend=None):
+        with self._swap_lock:
+            if version == self.version:
+                return
+            backend = backend or open_backend(self._version_dir(version), self.backend_name,
+                                              **self.backend_options)
+            self.backend, self.version = backend, version
+        for listener in self._listeners:
+            listener(version, self._version_dir(version), backend)
+
+    def _clone(self, source_dir, new_dir):
+        """Start a new snapshot from source_dir.
+
+        numpy data files are hard-linked: they are only appended to, and
+        older snapshots never read past their own row count. The BM25 index
+        is hard-linked too, since it is only ever replaced whole. Other files
+        are small and copied. Other backends rewrite files in place, so they
+        are copied whole.
+        """
+        if self.backend_name != "numpy":
+            shutil.copytree(source_dir, new_dir)
+            return
+        os.makedirs(new_dir)
+        for name in os.listdir(source_dir):
+            source, target = os.path.join(source_dir, name), os.path.join(new_dir, name)
+            if name in LINKED_FILES:
+                try:
+                    os.link(source, target)
+                    continue
+                except OSError:
+                    pass
+            if os.path.isdir(source):
+                shutil.copytree(source, target)
+            else:
+                shutil.copy2(source, target)
+
+    def refresh(self):
+        """Switch to the published version if it differs from the one in use"""
+        self._checked_at = time.monotonic()
+        version = self._published_version()
+        if version is not None:
+            self._swap(version)
+        return self.version
+
+    def _current(self):
+        if self.refresh_interval_s is not None and time.monotonic() - self._checked_at >= self.refresh_interval_s:
+            self.refresh()
+        return self.backend
+
+    def update(self, source, remove_missing=True, **ingest_options):
+        """Build and publish a new version reflecting source.
+
+        source (directory, manifest or list of paths) describes the whole
+        corpus unless remove_missing=False. Queries keep running on the
+        previous version until the new one is published. Returns the ingest
+        statistics plus the version and timing of each step.
+        """
+        with self._update_lock:
+            start = time.perf_counter()
+            previous = self._published_version()
+            versions = sorted(os.listdir(os.path.join(self.root, VERSIONS_DIR)))
+            number = int(versions[-1][1:]) + 1 if versions else 1
+            version = f"v{number:06d}"
+            new_dir = self._version_dir(version)
+            if previous is not None:
+                self._clone(self._version_dir(previous), new_dir)
+            copied_s = time.perf_counter() - start
+
+            try:
+                backend = open_backend(new_dir, self.backend_name, **self.backend_options)
+                stats = ingest(source, new_dir, backend=backend, remove_missing=remove_missing, **ingest_options)
+                stats["compacted_rows"] = 0
+                if hasattr(backend, "compact") and backend.deleted_fraction() > self.compact_ratio:
+                    stats["compacted_rows"] = backend.compact()
+            except Exception:
+                shutil.rmtree(new_dir, ignore_errors=True)
+                raise
+            if previous is not None and not (stats["files"] or stats["removed"]):
+                # Nothing changed: keep serving the published version
+                shutil.rmtree(new_dir, ignore_errors=True)
+                version = previous
+            else:
+                self._publish(version)
+                self._swap(version, backend)
+                self._prune()
+            stats.update(version=version, previous_version=previous, copy_s=copied_s,
+                         update_s=time.perf_counter() - start)
+            self.last_update = stats
+            return stats
+
+    def _prune(self):
+        """Delete the oldest versions beyond keep_versions (never the published one)"""
+        versions = sorted(os.listdir(os.path.join(self.root, VERSIONS_DIR)))
+        for version in versions[:-self.keep_versions]:
+            if version != self.version:
+                shutil.rmtree(self._version_dir(version), ignore_errors=True)
+
+    # Backend interface, always answered from one snapshot
+
+    def search(self, vector, k=DEFAULT_TOP_K):
+        backend = self._current()
+        return backend.search(vector, k) if backend is not None else []
+
+    def iter_documents(self):
+        backend = self._current()
+        return backend.iter_documents() if backend is not None else []
+
+    def count(self):
+        backend = self._current()
+        return backend.count() if backend is not None else 0
+
+    def metrics(self):
+        return {"version": self.version, "count": self.count(), "last_update": self.last_update}
+
+def setup_live_corpus(root, top_k=DEFAULT_TOP_K, backend="numpy", source=None, hybrid=False, rerank=False,
+                      **kwargs):
+    """Build a search tool over a LiveIndex, ingesting source first if given.
+
+    The tool's backend is the LiveIndex (tool.backend.update(...) publishes
+    a new version without touching the crew). With hybrid=True the tool
+    fuses BM25 with dense search (see hybrid.py); the BM25 index is
+    reloaded for every published version.
+    """
+    index = LiveIndex(root, backend=backend, **kwargs)
+    if source is not None:
+        index.update(source)
+    elif index.version is not None:
+        check_embedder(index._version_dir(index.version))
+    if not hybrid:
+        return CorpusSearchTool(backend=index, top_k=top_k)
+
+    from .hybrid import BM25Index, HybridRetriever, HybridSearchTool, load_or_build_bm25
+    retriever = HybridRetriever(index, BM25Index([], []), rerank=rerank)
+
+    def reload_bm25(version, index_dir, version_backend):
+        retriever.bm25 = load_or_build_bm25(index_dir, version_backend)
+
+    index.on_swap(reload_bm25)
+    return HybridSearchTool(backend=index, retriever=retriever, top_k=top_k)
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish a new version of a live corpus index")
+    parser.add_argument("source", help="Directory of PDFs or manifest file describing the whole corpus")
+    parser.add_argument("--root", required=True)
+    parser.add_argument("--backend", choices=["chroma", "numpy"], default="numpy")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--keep", action="store_true", help="Keep indexed files missing from source")
+    args = parser.parse_args()
+    index = LiveIndex(args.root, backend=args.backend, refresh_interval_s=None)
+    stats = index.update(args.source, remove_missing=not args.keep, workers=args.workers)
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Exact-prompt LLM response cache shared by the crew's agents.
+
+Responses are keyed on a hash of the model parameters (LangChain's llm
+string: model name, temperature, max_tokens, stop words, ...) and the full
+serialized message list. At temperature 0.1 repeated prompts (the Router
+prompt for a question, a grader verdict for the same retriever output, ...)
+are treated as deterministic. Lookups go to a memory LRU first, then to an
+optional SQLite file shared across processes and restarts; both tiers are
+bounded by entry count and bytes.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from .pdf_cache import DEFAULT_CACHE_DIR
+
+LLM_CACHE_FILENAME = "llm_cache.sqlite"
+
+def cache_key(prompt, llm_string):
+    """Hash of the model parameters and the serialized messages"""
+    return hashlib.sha256(f"{llm_string}\0{prompt}".encode()).hexdigest()
+
+class LLMResponseCache(BaseCache):
+    """Two-tier (memory LRU + SQLite) LangChain cache of chat responses.
+
+    path=None keeps the cache in memory only; pass default_cache_path() (or
+    any file) to persist it. The disk tier evicts least recently used rows
+    once it holds more than disk_max_entries rows or disk_max_bytes bytes;
+    it keeps running row/byte totals so writes do not scan the table, and
+    recounts only when they cross a bound (other processes may have written).
+    """
+
+    def __init__(self, path=None, max_entries=4096, max_bytes=64 << 20,
+                 disk_max_entries=100_000, disk_max_bytes=1 << 30):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_max_entries = disk_max_entries
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()  # key -> serialized generations
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._db = None
+        self._disk_count = self._disk_bytes = 0
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+            self._count_disk()
+
+    def _count_disk(self):
+        """Recount the disk tier's rows and bytes (lock held)"""
+        self._disk_count, self._disk_bytes = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    def _remember(self, key, value):
+        """Store in the memory tier and evict down to its bounds (lock held)"""
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = value
+        self._memory_bytes += len(value)
+        while self._memory and (len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._stats["evictions"] += 1
+
+    def lookup(self, prompt, llm_string):
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+            elif self._db is not None:
+                row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = row[0]
+                    self._db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (time.time(), key))
+                    self._remember(key, value)
+                    self._stats["disk_hits"] += 1
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+        return [loads(generation) for generation in json.loads(value)]
+
+    def update(self, prompt, llm_string, return_val):
+        key = cache_key(prompt, llm_string)
+        value = json.dumps([dumps(generation) for generation in return_val])
+        with self._lock:
+            self._remember(key, value)
+            self._stats["writes"] += 1
+            if self._db is not None:
+                row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self._disk_count += 1
+                else:
+                    self._disk_bytes -= row[0]
+                self._disk_bytes += len(value)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, used_at) VALUES (?, ?, ?, ?)",
+                    (key, value, len(value), time.time()),
+                )
+                self._evict_disk()
+
+    def _evict_disk(self):
+        """Once over a disk bound, drop least recently used rows down to 90% of it (lock held)"""
+        if self._disk_count <= self.disk_max_entries and self._disk_bytes <= self.disk_max_bytes:
+            return
+        self._count_disk()
+        count, size = self._disk_count, self._disk_bytes
+        if count <= self.disk_max_entries and size <= self.disk_max_bytes:
+            return
+        max_count, max_size = int(self.disk_max_entries * 0.9), int(self.disk_max_bytes * 0.9)
+        for key, row_size in self._db.execute("SELECT key, size FROM responses ORDER BY used_at").fetchall():
+            if count <= max_count and size <= max_size:
+                break
+            count -= 1
+            size -= row_size
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._stats["evictions"] += 1
+        self._disk_count, self._disk_bytes = count, size
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._disk_count = self._disk_bytes = 0
+
+    def metrics(self):
+        """Hit rate per tier and the size of each tier"""
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            report = {
+                **self._stats,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
+            if self._db is not None:
+                self._count_disk()
+                report.update(disk_entries=self._disk_count, disk_bytes=self._disk_bytes)
+            return report
+
+def default_cache_path(cache_dir=None):
+    """SQLite file for the persistent tier, next to the PDF cache"""
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, LLM_CACHE_FILENAME)
+
+def with_cache(llm, cache):
+    """Copy of a LangChain chat model using cache (False disables any global cache).
+
+    The copy shares the client, rate limiter and callbacks of llm. Chat
+    models are pydantic v1 models in the langchain-core 0.2 that crewai 0.5x
+    installs, and v2 models from langchain-core 0.3 on.
+    """
+    copy = getattr(llm, "model_copy", None) or llm.copy
+    return copy(update={"cache": cache})
@@ -4,21 +4,41 @@ This file demonstrates how to use both the original monolithic approach and the
 """
 
 # NEW MODULAR APPROACH (RECOMMENDED)
-from .config import setup_llm
-from .tools import setup_pdf
-from .crew import create_rag_crew, run_rag_query
 
 def main_modular():
     """Main function using the new modular structure"""
     
-    # Setup LLM
-    llm = setup_llm()
+    # Heavy dependencies are imported on first use so importing this module stays cheap
+    from functools import partial
+    from .config import llm_for, llm_metrics, llm_pool_configured, setup_llm, setup_llms
+    from .tools import prepare_pdf, setup_pdf
+    from .crew import create_rag_crew, run_rag_batch
+    from .instrumentation import ReportSink, add_sink
+    from .router import PreRouter
+    from .semantic_cache import SemanticCache
+    from .llm_cache import LLMResponseCache, default_cache_path
+    
+    # Print a per-stage latency and token report for every query
+    add_sink(ReportSink())
+    
+    # Setup LLMs: one model for every agent, or with AGENTIC_AI_LLM_CONFIG / LLM_FALLBACK_API_BASE
+    # a small model for the router and graders and a large one for answers, failed over across providers
+    llms = setup_llms() if llm_pool_configured() else setup_llm()
     
     # Setup PDF tool
     rag_tool = setup_pdf()
     
-    # Create RAG crew
-    rag_crew = create_rag_crew(llm, rag_tool)
+    # Route questions locally, asking the Router agent only when unsure
+    prerouter = PreRouter.from_pdf(llm_for(llms, "router"))
+    
+    # Reuse answers for paraphrased repeats until the PDF index changes
+    answer_cache = SemanticCache(index_version=prepare_pdf()["key"])
+    
+    # Memoize identical LLM calls (router/grader prompts) across queries and restarts
+    llm_cache = LLMResponseCache(default_cache_path())
+    
+    # Build RAG crews (one per concurrent worker)
+    make_crew = partial(create_rag_crew, llms, rag_tool, prerouted=True, llm_cache=llm_cache)
     
     # Example queries
     questions = [
@@ -26,16 +46,22 @@ def main_modular():
         "Tell me about LLMs using web_search?",  # Web search question
     ]
     
-    for question in questions:
+    # Questions run concurrently, each worker on its own crew
+    for item in run_rag_batch(make_crew, questions, prerouter=prerouter, cache=answer_cache):
         print(f"\n{'='*60}")
-        print(f"Question: {question}")
+        print(f"Question: {item['question']}")
         print(f"{'='*60}")
         
-        try:
-            result = run_rag_query(rag_crew, question)
-            print(f"Answer: {result}")
-        except Exception as e:
-            print(f"Error: {e}")
+        if item['error'] is None:
+            print(f"Answer: {item['result']}")
+        else:
+            print(f"Error: {item['error']}")
+        print(f"Latency: {item['latency_s']:.2f}s")
+    
+    print(f"Router metrics: {prerouter.metrics()}")
+    print(f"Answer cache metrics: {answer_cache.metrics()}")
+    print(f"LLM cache metrics: {llm_cache.metrics()}")
+    print(f"LLM provider metrics: {llm_metrics(llms)}")
 
 # ORIGINAL MONOLITHIC APPROACH (COMMENTED OUT FOR REFERENCE)
 """
@@ -0,0 +1,173 @@
+"""
+Parallel retrieval from the vectorstore and the web for one answer synthesis.
+
+Instead of routing and then retrieving from one source, both sources are
+searched concurrently, their results merged and deduplicated with a score
+per source, and a tool-less Retriever synthesizes one answer from the merged
+context. Retrieval then costs the slower source's latency rather than a
+router call plus, on a wrong route, a rejected pipeline run.
+"""
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .embeddings import embed_query
+from .instrumentation import tool_span
+from .retrieval import DEFAULT_TOP_K
+from .web_search import get_web_search_client
+
+VECTORSTORE = "vectorstore"
+WEB = "web"
+
+def split_tool_output(output):
+    """Chunks of a PDFSearchTool answer ('Relevant Content:' then chunks separated by blank lines)"""
+    if output.startswith("Relevant Content:"):
+        output = output[len("Relevant Content:"):]
+    return [chunk.strip() for chunk in re.split(r"\n\s*\n", output) if chunk.strip()]
+
+def search_vectorstore(rag_tool, question, k=DEFAULT_TOP_K):
+    """Scored (score, document, metadata) hits from the rag_tool's index.
+
+    PDFSearchTool exposes no scores, so its output is split back into chunks,
+    each a hit with score None in the tool's order; the corpus and hybrid
+    tools return real scores.
+    """
+    with tool_span("rag_tool"):
+        if getattr(rag_tool, "retriever", None) is not None:
+            return rag_tool.retriever.search(question, k)
+        if getattr(rag_tool, "backend", None) is not None:
+            return rag_tool.backend.search(embed_query(question), k)
+        return [(None, chunk, {"source": "pdf"}) for chunk in split_tool_output(rag_tool._run(query=question))][:k]
+
+def search_web(question, client=None):
+    """Scored (score, document, metadata) hits from the web search client"""
+    with tool_span("web_search_tool"):
+        results = (client or get_web_search_client()).search(question)
+    return [
+        (result.get("score"), result.get("content", ""), {"source": result.get("url", "web"),
+                                                          "title": result.get("title")})
+        for result in results
+    ]
+
+def _content_key(document):
+    return re.sub(r"\W+", " ", document.lower()).strip()[:300]
+
+def merge_results(ranked_by_origin, rrf_k=60):
+    """Merge ranked hits from several origins, deduplicated by content.
+
+    ranked_by_origin maps an origin ('vectorstore', 'web') to its hits.
+    Returns dicts with document, metadata, per-origin scores and the fused
+    reciprocal-rank score, best first.
+    """
+    merged = {}
+    for origin, hits in ranked_by_origin.items():
+        for rank, (score, document, metadata) in enumerate(hits, 1):
+            key = _content_key(document)
+            if not key:
+                continue
+            entry = merged.setdefault(key, {"document": document, "metadata": metadata, "scores": {}, "fused": 0.0})
+            entry["scores"][origin] = score
+            entry["fused"] += 1.0 / (rrf_k + rank)
+    return sorted(merged.values(), key=lambda entry: entry["fused"], reverse=True)
+
+def format_merged(entries):
+    """Format merged hits as the context passed to the synthesis task"""
+    formatted_results = []
+    for i, entry in enumerate(entries, 1):
+        scores = ", ".join(
+            f"{origin} {score:.3f}" if score is not None else origin
+            for origin, score in entry["scores"].items()
+        )
+        source = entry["metadata"].get("source", "unknown")
+        formatted_results.append(f"Result {i} ({scores}):\nSource: {source}\nContent: {entry['document']}\n")
+    return "\n".join(formatted_results)
+
+class ParallelRetrieval:
+    """Concurrent vectorstore + web retrieval feeding a synthesis crew.
+
+    make_crew builds a synthesis crew, e.g. functools.partial(create_rag_crew,
+    llm, rag_tool, parallel_retrieval=True); every thread answering questions
+    gets its own (see worker_crew). With always=True every question uses it;
+    otherwise run_rag_query uses it only for questions its PreRouter cannot
+    route locally, in place of asking the Router agent.
+    """
+
+    def __init__(self, make_crew, rag_tool, top_k=DEFAULT_TOP_K, max_results=6, always=False,
+                 web_client=None, max_workers=8):
+        self.make_crew = make_crew
+        self.rag_tool = rag_tool
+        self.top_k = top_k
+        self.max_results = max_results
+        self.always = always
+        self.web_client = web_client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agentic-ai-retrieval")
+        self._lock = threading.Lock()
+        self._stats = {"queries": 0, "errors": 0, "duplicates": 0}
+        self._latency_s = {VECTORSTORE: 0.0, WEB: 0.0, "total": 0.0}
+        self._local = threading.local()
+
+    def worker_crew(self):
+        """This thread's synthesis crew, built on first use (crews are never shared or copied)"""
+        if getattr(self._local, "crew", None) is None:
+            self._local.crew = self.make_crew()
+        return self._local.crew
+
+    def _timed(self, origin, search):
+        start = time.perf_counter()
+        try:
+            return search()
+        finally:
+            with self._lock:
+                self._latency_s[origin] += time.perf_counter() - start
+
+    def retrieve(self, question):
+        """Search both sources concurrently; returns (context, merged entries).
+
+        A failing source is skipped as long as the other one answers. Each
+        search runs in a copy of the caller's context, so its tool span lands
+        in the caller's query trace.
+        """
+        start = time.perf_counter()
+        futures = {
+            VECTORSTORE: self._executor.submit(
+                contextvars.copy_context().run, self._timed, VECTORSTORE,
+                lambda: search_vectorstore(self.rag_tool, question, self.top_k)),
+            WEB: self._executor.submit(
+                contextvars.copy_context().run, self._timed, WEB, lambda: search_web(question, self.web_client)),
+        }
+        ranked, errors = {}, []
+        for origin, future in futures.items():
+            try:
+                ranked[origin] = future.result()
+            except Exception as e:
+                errors.append(e)
+        if not ranked:
+            raise errors[-1]
+        merged = merge_results(ranked)
+        with self._lock:
+            self._stats["queries"] += 1
+            self._stats["errors"] += len(errors)
+            self._stats["duplicates"] += sum(len(hits) for hits in ranked.values()) - len(merged)
+            self._latency_s["total"] += time.perf_counter() - start
+        entries = merged[:self.max_results]
+        return format_merged(entries), entries
+
+    def metrics(self):
+        """Mean latency per source and overall, and the time saved by overlapping them"""
+        with self._lock:
+            queries = self._stats["queries"]
+            mean = {origin: (total / queries if queries else None) for origin, total in self._latency_s.items()}
+            return {
+                **self._stats,
+                "mean_vectorstore_s": mean[VECTORSTORE],
+                "mean_web_s": mean[WEB],
+                "mean_retrieval_s": mean["total"],
+                "mean_overlap_saved_s": (
+                    mean[VECTORSTORE] + mean[WEB] - mean["total"] if queries else None
+                ),
+            }
+
+    def close(self):
+        """Shut down the search threads"""
+        self._executor.shutdown(wait=False)
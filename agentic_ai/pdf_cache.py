@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import re
+import time
+import requests
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "AGENTIC_AI_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "agentic_ai"),
+)
+MANIFEST_NAME = "manifest.json"
+# How long a downloaded PDF is used without revalidation when the server sends no Cache-Control max-age
+DEFAULT_MAX_AGE_S = float(os.environ.get("AGENTIC_AI_PDF_MAX_AGE_S", 24 * 3600))
+
+def file_sha256(path, block_size=1 << 20):
+    """Return the hex SHA-256 of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(cache_dir):
+    """Load the cache manifest, or an empty one if none exists yet"""
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"downloads": {}, "indexes": {}}
+    with open(path) as file:
+        return json.load(file)
+
+def save_manifest(cache_dir, manifest):
+    """Atomically write the cache manifest"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def fresh_for(response, max_age_s):
+    """Seconds a response stays fresh: its Cache-Control max-age, else max_age_s"""
+    cache_control = response.headers.get("Cache-Control", "")
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return 0.0
+    match = re.search(r"max-age=(\d+)", cache_control)
+    return float(match.group(1)) if match else max_age_s
+
+def fetch_pdf(url, cache_dir=DEFAULT_CACHE_DIR, filename=None, timeout=60, max_age_s=DEFAULT_MAX_AGE_S):
+    """Download a PDF into the cache unless the cached copy is still current.
+
+    A cached copy is used without any request while it is fresh (the
+    server's Cache-Control max-age, else max_age_s since it was last
+    fetched or revalidated). After that it is revalidated with a
+    conditional GET (ETag / Last-Modified) and reused on 304 or when the
+    server cannot be reached.
+    Returns (path, sha256, etag).
+    """
+    manifest = load_manifest(cache_dir)
+    entry = manifest["downloads"].get(url)
+    pdf_dir = os.path.join(cache_dir, "pdfs")
+    os.makedirs(pdf_dir, exist_ok=True)
+    path = os.path.join(pdf_dir, filename or hashlib.sha256(url.encode()).hexdigest()[:16] + ".pdf")
+
+    cached = (
+        entry is not None
+        and os.path.exists(entry["path"])
+        and file_sha256(entry["path"]) == entry["sha256"]
+    )
+    if cached and time.time() < entry.get("fresh_until", 0):
+        return entry["path"], entry["sha256"], entry.get("etag")
+    headers = {}
+    if cached:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+    except requests.RequestException:
+        if cached:
+            return entry["path"], entry["sha256"], entry.get("etag")
+        raise
+
+    if cached and response.status_code == 304:
+        entry["fresh_until"] = time.time() + fresh_for(response, max_age_s)
+        save_manifest(cache_dir, manifest)
+        return entry["path"], entry["sha256"], entry.get("etag")
+    response.raise_for_status()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(response.content)
+    os.replace(tmp_path, path)
+
+    sha256 = file_sha256(path)
+    manifest["downloads"][url] = {
+        "path": path,
+        "sha256": sha256,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fresh_until": time.time() + fresh_for(response, max_age_s),
+    }
+    save_manifest(cache_dir, manifest)
+    return path, sha256, response.headers.get("ETag")
+
+def index_key(url, sha256, embedder_model, chunk_size, chunk_overlap):
+    """Content-addressed key for an embedded index of one PDF"""
+    payload = json.dumps(
+        {
+            "url": url,
+            "sha256": sha256,
+            "embedder_model": embedder_model,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def index_dir(cache_dir, key):
+    """Directory holding the persisted vector store for an index key"""
+    return os.path.join(cache_dir, "index", key)
+
+def is_index_built(cache_dir, key):
+    """Whether an index for this key was fully built by a previous run"""
+    return key in load_manifest(cache_dir)["indexes"] and os.path.isdir(index_dir(cache_dir, key))
+
+def mark_index_built(cache_dir, key, meta):
+    """Record a completed index build in the manifest"""
+    manifest = load_manifest(cache_dir)
+    manifest["indexes"][key] = meta
+    save_manifest(cache_dir, manifest)
@@ -0,0 +1,227 @@
+"""
+Provider pool: one chat model backed by several OpenAI-compatible endpoints.
+
+Each call goes to the healthy provider with the lowest expected latency
+(smoothed latency scaled by its in-flight calls). When the call has not
+returned after that provider's p95 latency, the same request is hedged to
+the next provider and the first answer wins. Timeouts, connection errors,
+429s and 5xx fail over to the next provider at once, and the failing
+provider sits out a cool-down. Client errors (bad request, context length,
+auth) are raised at once, since every provider would reject the request.
+Every provider keeps a latency histogram for metrics().
+"""
+import bisect
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, List
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+HISTOGRAM_BUCKETS_S = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="agentic-ai-provider")
+
+_TRANSIENT_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError", "TimeoutException", "NetworkError", "RemoteProtocolError",
+}
+
+def is_retryable(error):
+    """Whether another provider may succeed: timeouts, connection errors, 408/409/429 and 5xx"""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 409, 429) or status >= 500
+    return isinstance(error, (TimeoutError, ConnectionError)) or any(
+        cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(error).__mro__
+    )
+
+class LatencyHistogram:
+    """Bucketed latency counts plus a window of recent samples for percentiles"""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS_S, window=512):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.recent.append(seconds)
+
+    def percentile(self, q):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))]
+
+    def to_dict(self):
+        labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "p50_s": self.percentile(50),
+            "p95_s": self.percentile(95),
+            "p99_s": self.percentile(99),
+        }
+
+class Provider:
+    """One endpoint/model of a pool with its latency and health statistics"""
+
+    def __init__(self, name, llm, cooldown_s=10.0, smoothing=0.2):
+        self.name = name
+        self.llm = llm
+        self.cooldown_s = cooldown_s
+        self.smoothing = smoothing
+        self.histogram = LatencyHistogram()
+        self.ewma_s = None
+        self.in_flight = 0
+        self.unhealthy_until = 0.0
+        self.stats = {"calls": 0, "errors": 0, "hedges": 0, "wins": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        return getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None) or self.name
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def healthy(self):
+        return time.monotonic() >= self.unhealthy_until
+
+    def expected_latency_s(self):
+        with self._lock:
+            # Unmeasured providers look fast so they get sampled
+            return (self.ewma_s or 0.0) * (1 + self.in_flight)
+
+    def call(self, messages, stop=None, **kwargs):
+        """Run one chat completion and record its latency or failure"""
+        with self._lock:
+            self.in_flight += 1
+            self.stats["calls"] += 1
+        start = time.perf_counter()
+        try:
+            result = self.llm.generate([messages], stop=stop, **kwargs)
+        except Exception as e:
+            self.failed(e)
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        elapsed_s = time.perf_counter() - start
+        with self._lock:
+            self.histogram.observe(elapsed_s)
+            self.ewma_s = elapsed_s if self.ewma_s is None else (
+                self.smoothing * elapsed_s + (1 - self.smoothing) * self.ewma_s
+            )
+        llm_output = dict(result.llm_output or {}, provider=self.name)
+        return ChatResult(generations=result.generations[0], llm_output=llm_output)
+
+    def failed(self, error):
+        """Count an error; transient ones bench the provider for cooldown_s"""
+        with self._lock:
+            self.stats["errors"] += 1
+            if is_retryable(error):
+                self.unhealthy_until = time.monotonic() + self.cooldown_s
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "model": self.model,
+                **self.stats,
+                "in_flight": self.in_flight,
+                "healthy": self.healthy(),
+                "ewma_s": self.ewma_s,
+                **self.histogram.to_dict(),
+            }
+
+class ProviderPool(BaseChatModel):
+    """Chat model that balances, hedges and fails over across providers.
+
+    Calls are hedged after the chosen provider's p95 latency once it has
+    hedge_min_samples samples (clamped to hedge_min_s..hedge_max_s), at most
+    max_hedges times per call. Streams pick the best provider and fail over
+    only before the first token.
+    """
+
+    providers: List[Any]
+    hedge_min_samples: int = 20
+    hedge_min_s: float = 0.25
+    hedge_max_s: float = 30.0
+    max_hedges: int = 1
+
+    @property
+    def _llm_type(self):
+        return "provider_pool"
+
+    @property
+    def _identifying_params(self):
+        return {"models": [f"{provider.name}/{provider.model}" for provider in self.providers]}
+
+    def ranked(self):
+        """Providers in the order they should be tried"""
+        return sorted(self.providers, key=lambda provider: (not provider.healthy(), provider.expected_latency_s()))
+
+    def _hedge_delay(self, provider):
+        if self.max_hedges <= 0 or len(provider.histogram.recent) < self.hedge_min_samples:
+            return None
+        return min(self.hedge_max_s, max(self.hedge_min_s, provider.histogram.percentile(95)))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        candidates = iter(self.ranked())
+        pending = {}  # future -> provider
+        errors = []
+        hedges = 0
+
+        def launch(hedge=False):
+            provider = next(candidates, None)
+            if provider is not None:
+                if hedge:
+                    provider.count("hedges")
+                pending[_executor.submit(provider.call, messages, stop, **kwargs)] = provider
+            return provider
+
+        primary = launch()
+        while pending:
+            delay = self._hedge_delay(primary) if hedges < self.max_hedges and len(pending) == 1 else None
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                # Slower than its p95: race the next provider, keep waiting on both
+                hedges = hedges + 1 if launch(hedge=True) is not None else self.max_hedges
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    errors.append(e)
+                    continue
+                provider.count("wins")
+                return result
+            if not pending:
+                primary = launch()
+        raise errors[-1]
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        errors = []
+        for provider in self.ranked():
+            started = False
+            try:
+                for chunk in provider.llm.stream(messages, stop=stop, **kwargs):
+                    started = True
+                    if run_manager is not None and chunk.content:
+                        run_manager.on_llm_new_token(chunk.content)
+                    yield ChatGenerationChunk(message=chunk)
+                return
+            except Exception as e:
+                provider.failed(e)
+                if started or not is_retryable(e):
+                    raise
+                errors.append(e)
+        raise errors[-1]
+
+    def metrics(self):
+        """Per-provider calls, errors, hedges, wins and latency histograms"""
+        return {provider.name: provider.metrics() for provider in self.providers}
@@ -0,0 +1,356 @@
+"""
+Retrieval backends and the corpus search tool used by the Retriever agent.
+
+A backend stores normalized chunk embeddings with their text and metadata and
+answers top-k cosine queries. Every backend exposes the same methods:
+
+    add(ids, vectors, documents, metadatas)
+    delete_source(source)
+    search(vector, k) -> [(score, document, metadata), ...]
+    iter_documents() -> [(document, metadata), ...] for every live chunk
+    source_embeddings(source) -> {document: vector} for one source's chunks
+    count()
+"""
+import itertools
+import json
+import os
+from typing import Any, Type
+import numpy as np
+from crewai_tools import BaseTool
+from pydantic import BaseModel, Field
+from .embeddings import embed_query
+from .instrumentation import tool_span
+
+DEFAULT_TOP_K = 3
+
+class ChromaBackend:
+    """Persistent Chroma collection fed with precomputed embeddings"""
+
+    def __init__(self, index_dir, collection_name="corpus"):
+        import chromadb
+        self.client = chromadb.PersistentClient(path=index_dir)
+        self.collection = self.client.get_or_create_collection(
+            collection_name, metadata={"hnsw:space": "cosine"}
+        )
+
+    def add(self, ids, vectors, documents, metadatas):
+        self.collection.upsert(
+            ids=list(ids),
+            embeddings=[vector.tolist() for vector in vectors],
+            documents=list(documents),
+            metadatas=list(metadatas),
+        )
+
+    def delete_source(self, source):
+        self.collection.delete(where={"source": source})
+
+    def search(self, vector, k=DEFAULT_TOP_K):
+        result = self.collection.query(query_embeddings=[vector.tolist()], n_results=k)
+        return [
+            (1.0 - distance, document, metadata)
+            for distance, document, metadata in zip(
+                result["distances"][0], result["documents"][0], result["metadatas"][0]
+            )
+        ]
+
+    def iter_documents(self):
+        result = self.collection.get(include=["documents", "metadatas"])
+        return list(zip(result["documents"], result["metadatas"]))
+
+    def source_embeddings(self, source):
+        result = self.collection.get(where={"source": source}, include=["documents", "embeddings"])
+        return {
+            document: np.asarray(vector, dtype=np.float32)
+            for document, vector in zip(result["documents"], result["embeddings"])
+        }
+
+    def count(self):
+        return self.collection.count()
+
+class NumpyBackend:
+    """Memory-mapped float32 (or int8-quantized) embedding matrix.
+
+    Layout of index_dir:
+        meta.json     dim, row count, dtype and deleted rows
+        vectors.bin   row-major float32 or int8 embeddings
+        scales.bin    float32 per-row scales (int8 only)
+        chunks.jsonl  one {"id", "document", "metadata"} record per row
+        offsets.bin   int64 byte offset of each chunks.jsonl record
+
+    Readers map the files read-only, so every worker process on a host shares
+    the same page-cache copy of the index. Top-k is an exact matrix-vector
+    product unless an IVF index has been built with build_ivf().
+
+    The data files are only ever appended to (or replaced whole by
+    compact()), and readers never look past meta["count"] rows, so a
+    snapshot may share them with a copy of the index through hard links
+    (see live_index.py).
+    """
+
+    APPEND_ONLY_FILES = ("vectors.bin", "scales.bin", "chunks.jsonl", "offsets.bin")
+
+    def __init__(self, index_dir, quantize=False, block_rows=65536):
+        self.index_dir = index_dir
+        self.block_rows = block_rows
+        os.makedirs(index_dir, exist_ok=True)
+        self._meta_path = os.path.join(index_dir, "meta.json")
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as file:
+                self.meta = json.load(file)
+        else:
+            self.meta = {"dim": None, "count": 0, "dtype": "int8" if quantize else "float32", "deleted": []}
+        self.refresh()
+
+    def _path(self, name):
+        return os.path.join(self.index_dir, name)
+
+    def refresh(self):
+        """Re-map the files, picking up rows written by another process"""
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as file:
+                self.meta = json.load(file)
+        count, dim = self.meta["count"], self.meta["dim"]
+        self._deleted = np.zeros(count, dtype=bool)
+        self._deleted[self.meta["deleted"]] = True
+        self._vectors = self._scales = self._offsets = None
+        self._ivf = None
+        if count:
+            dtype = np.int8 if self.meta["dtype"] == "int8" else np.float32
+            self._vectors = np.memmap(self._path("vectors.bin"), dtype=dtype, mode="r", shape=(count, dim))
+            self._offsets = np.memmap(self._path("offsets.bin"), dtype=np.int64, mode="r", shape=(count,))
+            if dtype is np.int8:
+                self._scales = np.memmap(self._path("scales.bin"), dtype=np.float32, mode="r", shape=(count,))
+            if self.meta.get("ivf") and self.meta["ivf"]["count"] == count:
+                self._ivf = (np.load(self._path("ivf_centroids.npy")), np.load(self._path("ivf_assign.npy")))
+
+    def _save_meta(self):
+        tmp_path = f"{self._meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.meta, file)
+        os.replace(tmp_path, self._meta_path)
+
+    def _truncate_to_count(self):
+        """Drop bytes past meta["count"] rows, left by an add that died before saving meta"""
+        count, dim = self.meta["count"], self.meta["dim"] or 0
+        itemsize = 1 if self.meta["dtype"] == "int8" else 4
+        chunks_bytes = 0
+        if count:
+            with open(self._path("chunks.jsonl"), "rb") as file:
+                file.seek(int(np.fromfile(self._path("offsets.bin"), dtype=np.int64, count=count)[-1]))
+                chunks_bytes = file.tell() + len(file.readline())
+        sizes = {"vectors.bin": count * dim * itemsize, "offsets.bin": count * 8, "chunks.jsonl": chunks_bytes}
+        if self.meta["dtype"] == "int8":
+            sizes["scales.bin"] = count * 4
+        for name, size in sizes.items():
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, "r+b") as file:
+                    file.truncate(size)
+
+    def add(self, ids, vectors, documents, metadatas):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.meta["dim"] is None:
+            self.meta["dim"] = int(vectors.shape[1])
+        self._truncate_to_count()
+        if self.meta["dtype"] == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0 + 1e-12
+            with open(self._path("scales.bin"), "ab") as file:
+                file.write(scales.astype(np.float32).tobytes())
+            vectors = np.round(vectors / scales[:, None]).astype(np.int8)
+        with open(self._path("vectors.bin"), "ab") as file:
+            file.write(vectors.tobytes())
+
+        offsets = []
+        with open(self._path("chunks.jsonl"), "ab") as file:
+            for chunk_id, document, metadata in zip(ids, documents, metadatas):
+                offsets.append(file.tell())
+                record = {"id": chunk_id, "document": document, "metadata": metadata}
+                file.write((json.dumps(record) + "\n").encode())
+        with open(self._path("offsets.bin"), "ab") as file:
+            file.write(np.asarray(offsets, dtype=np.int64).tobytes())
+
+        self.meta["count"] += len(offsets)
+        self._save_meta()
+        self.refresh()
+
+    def _source_rows(self, source):
+        """Live rows of one source and their records (sequential scan of chunks.jsonl)"""
+        if not self.meta["count"]:
+            return []
+        with open(self._path("chunks.jsonl"), "rb") as file:
+            records = ((row, json.loads(line)) for row, line in enumerate(file) if row < self.meta["count"])
+            return [
+                (row, record) for row, record in records
+                if not self._deleted[row] and record["metadata"].get("source") == source
+            ]
+
+    def delete_source(self, source):
+        rows = [row for row, _ in self._source_rows(source)]
+        if rows:
+            self.meta["deleted"] = sorted(set(self.meta["deleted"]) | set(rows))
+            self._save_meta()
+            self.refresh()
+
+    def deleted_fraction(self):
+        """Share of stored rows that are deleted (tombstoned)"""
+        return len(self.meta["deleted"]) / self.meta["count"] if self.meta["count"] else 0.0
+
+    def compact(self):
+        """Rewrite the data files without deleted rows; returns how many rows were dropped.
+
+        Every file is written under a new name and renamed into place, so
+        hard-linked copies of the old files are left untouched. The IVF
+        index is dropped (its row numbers change); rebuild it if needed.
+        Not safe against concurrent writers to this index_dir.
+        """
+        dropped = len(self.meta["deleted"])
+        if not dropped:
+            return 0
+        keep = np.flatnonzero(~self._deleted)
+        files = {"vectors.bin": np.ascontiguousarray(self._vectors[keep]).tobytes()}
+        if self._scales is not None:
+            files["scales.bin"] = np.ascontiguousarray(self._scales[keep]).tobytes()
+        lines, offsets, position = [], [], 0
+        for row in keep:
+            line = (json.dumps(self._record(int(row))) + "\n").encode()
+            offsets.append(position)
+            lines.append(line)
+            position += len(line)
+        files["chunks.jsonl"] = b"".join(lines)
+        files["offsets.bin"] = np.asarray(offsets, dtype=np.int64).tobytes()
+        self._vectors = self._scales = self._offsets = None
+        for name, data in files.items():
+            tmp_path = f"{self._path(name)}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, self._path(name))
+        self.meta.update(count=int(len(keep)), deleted=[])
+        self.meta.pop("ivf", None)
+        self._save_meta()
+        self.refresh()
+        return dropped
+
+    def _record(self, row):
+        with open(self._path("chunks.jsonl"), "rb") as file:
+            file.seek(int(self._offsets[row]))
+            return json.loads(file.readline())
+
+    def _scores(self, vector, rows=None):
+        """Cosine scores for all rows (or a subset), computed in blocks"""
+        vector = np.asarray(vector, dtype=np.float32)
+        if rows is not None:
+            scores = self._vectors[rows].astype(np.float32) @ vector
+            return scores * self._scales[rows] if self._scales is not None else scores
+        scores = np.empty(self.meta["count"], dtype=np.float32)
+        for begin in range(0, self.meta["count"], self.block_rows):
+            end = begin + self.block_rows
+            block = self._vectors[begin:end]
+            scores[begin:end] = (block if block.dtype == np.float32 else block.astype(np.float32)) @ vector
+        return scores * self._scales if self._scales is not None else scores
+
+    def search(self, vector, k=DEFAULT_TOP_K, n_probe=8):
+        if not self.meta["count"]:
+            return []
+        rows = None
+        if self._ivf is not None:
+            centroids, assign = self._ivf
+            lists = np.argsort(centroids @ vector)[-n_probe:]
+            rows = np.flatnonzero(np.isin(assign, lists))
+        scores = self._scores(vector, rows)
+        if not len(scores):
+            return []
+        deleted = self._deleted if rows is None else self._deleted[rows]
+        scores[deleted] = -np.inf
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        hits = []
+        for index in top:
+            if np.isfinite(scores[index]):
+                record = self._record(int(index if rows is None else rows[index]))
+                hits.append((float(scores[index]), record["document"], record["metadata"]))
+        return hits
+
+    def build_ivf(self, n_lists=None, iterations=10):
+        """Cluster rows into an inverted file index for sub-linear search"""
+        from .router import kmeans_centroids
+        count = self.meta["count"]
+        n_lists = n_lists or max(1, int(np.sqrt(count)))
+        sample = np.random.default_rng(0).choice(count, min(count, n_lists * 64), replace=False)
+        vectors = self._vectors[np.sort(sample)].astype(np.float32)
+        if self._scales is not None:
+            vectors *= self._scales[np.sort(sample)][:, None]
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        centroids = kmeans_centroids(vectors, n_lists, iterations)
+        assign = np.empty(count, dtype=np.int32)
+        for begin in range(0, count, self.block_rows):
+            block = self._vectors[begin:begin + self.block_rows].astype(np.float32)
+            assign[begin:begin + self.block_rows] = np.argmax(block @ centroids.T, axis=1)
+        np.save(self._path("ivf_centroids.npy"), centroids)
+        np.save(self._path("ivf_assign.npy"), assign)
+        self.meta["ivf"] = {"count": count, "n_lists": int(len(centroids))}
+        self._save_meta()
+        self.refresh()
+
+    def iter_documents(self):
+        if not self.meta["count"]:
+            return []
+        with open(self._path("chunks.jsonl"), "rb") as file:
+            # Rows past count may be half-written by a writer sharing the file
+            records = [json.loads(line) for line in itertools.islice(file, self.meta["count"])]
+        return [
+            (record["document"], record["metadata"])
+            for row, record in enumerate(records)
+            if not self._deleted[row]
+        ]
+
+    def source_embeddings(self, source):
+        embeddings = {}
+        for row, record in self._source_rows(source):
+            vector = self._vectors[row].astype(np.float32)
+            if self._scales is not None:
+                vector *= self._scales[row]
+                vector /= np.linalg.norm(vector) + 1e-12
+            embeddings[record["document"]] = vector
+        return embeddings
+
+    def count(self):
+        return int(self.meta["count"] - len(self.meta["deleted"]))
+
+BACKENDS = {
+    "chroma": ChromaBackend,
+    "numpy": NumpyBackend,
+}
+
+def open_backend(index_dir, backend="chroma", **kwargs):
+    """Open a retrieval backend by name"""
+    return BACKENDS[backend](index_dir, **kwargs)
+
+def format_hits(hits):
+    """Format search hits into a readable string for the agent"""
+    formatted_results = []
+    for i, (score, document, metadata) in enumerate(hits, 1):
+        source = metadata.get('source', 'unknown')
+        page = metadata.get('page', '?')
+        formatted_results.append(f"Result {i} (score {score:.3f}):\nSource: {source}, page {page}\nContent: {document}\n")
+    return "\n".join(formatted_results)
+
+class CorpusSearchToolSchema(BaseModel):
+    query: str = Field(..., description="Mandatory query you want to use to search the PDF corpus")
+
+class CorpusSearchTool(BaseTool):
+    name: str = "Search the PDF corpus"
+    description: str = "A tool that semantically searches the content of every indexed PDF document."
+    args_schema: Type[BaseModel] = CorpusSearchToolSchema
+    backend: Any = None
+    top_k: int = DEFAULT_TOP_K
+
+    def _run(self, query: str, **kwargs: Any) -> str:
+        with tool_span("rag_tool"):
+            return format_hits(self.backend.search(embed_query(query), self.top_k))
+
+def setup_corpus(index_dir, top_k=DEFAULT_TOP_K, backend="chroma", **kwargs):
+    """Build a search tool over a corpus index written by agentic_ai.ingest"""
+    from .ingest import check_embedder
+    check_embedder(index_dir)
+    return CorpusSearchTool(backend=open_backend(index_dir, backend, **kwargs), top_k=top_k)
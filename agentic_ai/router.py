@@ -0,0 +1,173 @@
+"""
+Deterministic pre-routing that decides vectorstore vs websearch before kickoff.
+
+Keyword rules are tried first, then the question embedding is compared with
+centroids of the indexed PDF's chunk embeddings. Only questions whose similarity
+falls between the two thresholds are sent to the Router agent.
+"""
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+import numpy as np
+from .embeddings import embed_query, embed_texts
+
+VECTORSTORE = 'vectorstore'
+WEBSEARCH = 'websearch'
+
+VECTORSTORE_KEYWORDS = (
+    'self-attention', 'attention mechanism', 'multi-head', 'positional encoding',
+    'transformer', 'encoder-decoder', 'scaled dot-product', 'retrieval-augmented',
+)
+WEBSEARCH_KEYWORDS = (
+    'web_search', 'web search', 'search the web', 'latest', 'current', 'today', 'news',
+)
+
+# Whole words only: 'current' must not match "recurrent", 'news' not "newsletter"
+_WEBSEARCH_PATTERN = re.compile(r"\b(?:" + "|".join(map(re.escape, WEBSEARCH_KEYWORDS)) + r")\b")
+_VECTORSTORE_PATTERN = re.compile(r"\b(?:" + "|".join(map(re.escape, VECTORSTORE_KEYWORDS)) + r")s?\b")
+
+CENTROIDS_FILENAME = "router_centroids.npy"
+
+@dataclass
+class RouteDecision:
+    route: str
+    confidence: float
+    method: str  # 'keyword', 'embedding', 'llm' or 'ambiguous'
+    latency_s: float
+
+def parse_route(text):
+    """Normalize a Router agent answer to 'vectorstore' or 'websearch'"""
+    return VECTORSTORE if VECTORSTORE in str(text).lower() else WEBSEARCH
+
+def keyword_route(question):
+    """Route by keyword rules; returns None when no rule matches"""
+    text = question.lower()
+    # An explicit request for the web wins over topic keywords
+    if _WEBSEARCH_PATTERN.search(text):
+        return WEBSEARCH
+    if _VECTORSTORE_PATTERN.search(text):
+        return VECTORSTORE
+    return None
+
+def kmeans_centroids(vectors, n_clusters=8, iterations=20, seed=0):
+    """Spherical k-means over normalized vectors; returns normalized centroids"""
+    n_clusters = min(n_clusters, len(vectors))
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)]
+    for _ in range(iterations):
+        labels = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(n_clusters):
+            members = vectors[labels == cluster]
+            if len(members):
+                centroids[cluster] = members.mean(axis=0)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+    return centroids.astype(np.float32)
+
+def load_or_build_centroids(pdf, chunk_size, chunk_overlap, n_clusters=8):
+    """Load chunk centroids for a prepared PDF, computing them on first use.
+
+    The centroids are stored next to the persisted index, so they share its
+    content-addressed cache key.
+    """
+    path = os.path.join(pdf["index_dir"], CENTROIDS_FILENAME)
+    if os.path.exists(path):
+        return np.load(path)
+    from .chunking import chunk_pdf
+    centroids = kmeans_centroids(embed_texts(chunk_pdf(pdf["path"], chunk_size, chunk_overlap)), n_clusters)
+    os.makedirs(pdf["index_dir"], exist_ok=True)
+    np.save(path, centroids)
+    return centroids
+
+class PreRouter:
+    """Route questions locally and fall back to the Router agent when unsure.
+
+    Similarity to the closest centroid at or above vectorstore_threshold routes
+    to the vectorstore, at or below websearch_threshold routes to the web, and
+    anything in between asks the Router agent. Without centroids only the
+    keyword rules run locally.
+    """
+
+    def __init__(self, llm, centroids, vectorstore_threshold=0.72, websearch_threshold=0.55):
+        self.llm = llm
+        self.centroids = centroids
+        self.vectorstore_threshold = vectorstore_threshold
+        self.websearch_threshold = websearch_threshold
+        self._lock = threading.Lock()
+        self._counts = {'keyword': 0, 'embedding': 0, 'llm': 0, 'ambiguous': 0}
+        self._local_latency_s = 0.0
+        self._llm_latency_s = 0.0
+
+    @classmethod
+    def from_pdf(cls, llm, pdf_url=None, cache_dir=None, **kwargs):
+        """Build a PreRouter from the cached PDF index used by setup_pdf"""
+        from .tools import CHUNK_OVERLAP, CHUNK_SIZE, PDF_URL, prepare_pdf
+        pdf = prepare_pdf(pdf_url or PDF_URL, cache_dir)
+        return cls(llm, load_or_build_centroids(pdf, CHUNK_SIZE, CHUNK_OVERLAP), **kwargs)
+
+    def classify(self, question):
+        """Route locally; returns (route, confidence, method), route None when unsure.
+
+        method is 'keyword' or 'embedding', whichever decided (or last tried).
+        """
+        route = keyword_route(question)
+        if route is not None:
+            return route, 1.0, 'keyword'
+        if self.centroids is None:
+            return None, 0.0, 'keyword'
+        similarity = float(np.max(self.centroids @ embed_query(question)))
+        if similarity >= self.vectorstore_threshold:
+            return VECTORSTORE, similarity, 'embedding'
+        if similarity <= self.websearch_threshold:
+            return WEBSEARCH, 1.0 - similarity, 'embedding'
+        return None, similarity, 'embedding'
+
+    def route(self, question, ask_llm=True):
+        """Decide the route for a question, calling the Router agent only if needed.
+
+        With ask_llm=False an unsure question gets route None and method
+        'ambiguous' instead (e.g. to search both sources, see parallel_retrieval.py).
+        """
+        start = time.perf_counter()
+        route, confidence, method = self.classify(question)
+        if route is None:
+            if ask_llm:
+                route, method = self._llm_route(question), 'llm'
+            else:
+                method = 'ambiguous'
+        latency_s = time.perf_counter() - start
+
+        with self._lock:
+            self._counts[method] += 1
+            if method == 'llm':
+                self._llm_latency_s += latency_s
+            else:
+                self._local_latency_s += latency_s
+        return RouteDecision(route, confidence, method, latency_s)
+
+    def _llm_route(self, question):
+        from crewai import Crew
+        from .agents import create_router_agent
+        from .tasks import create_router_task
+        agent = create_router_agent(self.llm)
+        crew = Crew(agents=[agent], tasks=[create_router_task(agent)], verbose=False)
+        return parse_route(crew.kickoff(inputs={"question": question}))
+
+    def metrics(self):
+        """Router hit rate and the estimated latency saved by local routing"""
+        with self._lock:
+            local = self._counts['keyword'] + self._counts['embedding']
+            total = local + self._counts['llm'] + self._counts['ambiguous']
+            mean_llm_s = self._llm_latency_s / self._counts['llm'] if self._counts['llm'] else None
+            mean_local_s = self._local_latency_s / local if local else None
+            return {
+                'queries': total,
+                'counts': dict(self._counts),
+                'hit_rate': local / total if total else 0.0,
+                'mean_local_latency_s': mean_local_s,
+                'mean_llm_latency_s': mean_llm_s,
+                'estimated_latency_saved_s': (
+                    local * mean_llm_s - self._local_latency_s if mean_llm_s is not None else None
+                ),
+            }
@@ -0,0 +1,103 @@
+"""
+Semantic answer cache in front of run_rag_query.
+
+Questions are embedded with the same bge-small model as the PDF index, and a
+new question reuses a stored answer when its cosine similarity to a cached
+question is at or above the threshold.
+"""
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from .embeddings import embed_query
+
+class SemanticCache:
+    """Bounded LRU + TTL cache of final answers keyed on question embeddings"""
+
+    def __init__(self, threshold=0.92, max_entries=1024, ttl_s=3600.0, index_version=None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.index_version = index_version
+        self._entries = OrderedDict()  # id -> (vector, question, answer, created_at)
+        self._next_id = 0
+        self._matrix = None
+        self._matrix_ids = []
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'stale_puts': 0}
+        self._lookup_latency_s = 0.0
+
+    def set_index_version(self, index_version):
+        """Drop every entry when the PDF index the answers came from changes"""
+        with self._lock:
+            if index_version != self.index_version:
+                self.index_version = index_version
+                self._entries.clear()
+                self._matrix = None
+                self._stats['invalidations'] += 1
+
+    def embed(self, question):
+        """Embed a question with the index's embedding model"""
+        return embed_query(question)
+
+    def get(self, question, vector=None):
+        """Return the cached answer for a near-duplicate question, or None"""
+        start = time.perf_counter()
+        vector = self.embed(question) if vector is None else vector
+        with self._lock:
+            self._expire()
+            answer = None
+            if self._entries:
+                if self._matrix is None:
+                    self._matrix_ids = list(self._entries)
+                    self._matrix = np.stack([self._entries[i][0] for i in self._matrix_ids])
+                scores = self._matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    entry_id = self._matrix_ids[best]
+                    self._entries.move_to_end(entry_id)
+                    answer = self._entries[entry_id][2]
+            self._stats['hits' if answer is not None else 'misses'] += 1
+            self._lookup_latency_s += time.perf_counter() - start
+            return answer
+
+    def put(self, question, answer, vector=None, index_version=None):
+        """Store the final answer for a question.
+
+        index_version is the cache's index_version when the query started; an
+        answer computed against an index that has since been replaced is dropped.
+        """
+        vector = self.embed(question) if vector is None else vector
+        with self._lock:
+            if index_version is not None and index_version != self.index_version:
+                self._stats['stale_puts'] += 1
+                return
+            self._entries[self._next_id] = (vector, question, answer, time.monotonic())
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+            self._matrix = None
+
+    def _expire(self):
+        if self.ttl_s is None:
+            return
+        cutoff = time.monotonic() - self.ttl_s
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry[3] < cutoff]
+        for entry_id in expired:
+            del self._entries[entry_id]
+        if expired:
+            self._stats['evictions'] += len(expired)
+            self._matrix = None
+
+    def metrics(self):
+        """Hit/miss counters and mean lookup latency"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+                'mean_lookup_latency_s': self._lookup_latency_s / lookups if lookups else None,
+                'index_version': self.index_version,
+            }
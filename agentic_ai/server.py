@@ -0,0 +1,370 @@
+"""
+HTTP service for the RAG crew.
+
+The LLM, rag_tool and a pool of crews are built once at startup (see
+warm.py). Queries run on a bounded worker pool, one pooled crew per running
+query; requests beyond the pool wait in a queue of limited depth and are
+rejected with 503 when it is full. Identical in-flight questions are
+coalesced into one pipeline execution.
+
+    python -m agentic_ai.server --workers 4 --max-queue 32 --port 8000
+
+Endpoints: POST /query, POST /query/stream (newline-delimited JSON events),
+GET /metrics and GET /healthz. With --live-index and an admin token
+(--admin-token or AGENTIC_AI_ADMIN_TOKEN), POST /admin/index publishes a new
+corpus version from PDFs under --admin-root that running crews use at once
+(see live_index.py).
+"""
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .web_search import normalize_query
+
+class QueueFull(Exception):
+    """Raised when the worker pool and its queue are both full"""
+
+def _percentile(ordered, q):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))]
+
+class QueryService:
+    """Bounded, coalescing executor for RAG queries on a WarmCrew.
+
+    At most max_workers queries run at once and at most max_queue more wait
+    for a worker. A request for a question that is already running (after
+    normalize_query) awaits that run instead of starting another. timeout_s
+    bounds how long a caller waits; a timed-out query keeps its worker until
+    the crew finishes, since a running crew cannot be interrupted.
+    answer_cache is an optional SemanticCache consulted by every query.
+    """
+
+    def __init__(self, warm, max_workers=4, max_queue=32, timeout_s=120.0, latency_window=1024,
+                 answer_cache=None):
+        self.warm = warm
+        self.answer_cache = answer_cache
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout_s = timeout_s
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agentic-ai-query")
+        self._inflight = {}  # normalized question -> asyncio.Future
+        self._pending = 0  # submitted to the executor and not finished
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._stats = {
+            "requests": 0, "executions": 0, "coalesced": 0, "rejected": 0,
+            "timeouts": 0, "errors": 0, "streams": 0,
+        }
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _reserve(self):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise QueueFull(f"{self._pending} queries pending")
+            self._pending += 1
+
+    def _release(self, *_):
+        with self._lock:
+            self._pending -= 1
+
+    def _forget(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def _run(self, question):
+        start = time.perf_counter()
+        try:
+            return str(self.warm.run(question, cache=self.answer_cache))
+        finally:
+            with self._lock:
+                self._latencies.append(time.perf_counter() - start)
+
+    async def answer(self, question):
+        """Answer a question; returns (answer, coalesced)"""
+        self._count("requests")
+        key = normalize_query(question)
+        future = self._inflight.get(key)
+        coalesced = future is not None
+        if coalesced:
+            self._count("coalesced")
+        else:
+            self._reserve()
+            self._count("executions")
+            future = asyncio.get_running_loop().run_in_executor(self._executor, self._run, question)
+            future.add_done_callback(self._release)
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self._inflight[key] = future
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout_s), coalesced
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise
+        except Exception:
+            if not coalesced:
+                self._count("errors")
+            raise
+
+    async def stream(self, question):
+        """Yield stream_rag_query events for a question on a pooled crew.
+
+        Streams are not coalesced, but they count against the same limit as
+        other queries. Their steps run on the default executor so a stream
+        holding a pooled crew never waits behind queries waiting for one.
+        Waiting longer than timeout_s for a pooled crew is a timeout, like a
+        query that takes too long.
+        """
+        from .streaming import stream_rag_query
+        self._count("requests")
+        self._count("streams")
+        self._reserve()
+        loop = asyncio.get_running_loop()
+        done = object()
+        checkout = self.warm.checkout(self.timeout_s)
+        try:
+            try:
+                crew = await loop.run_in_executor(None, checkout.__enter__)
+            except queue.Empty:
+                raise asyncio.TimeoutError("No pooled crew became free in time") from None
+            try:
+                events = stream_rag_query(crew, question, prerouter=self.warm.prerouter,
+                                          cache=self.answer_cache)
+                while True:
+                    event = await asyncio.wait_for(
+                        loop.run_in_executor(None, next, events, done), self.timeout_s)
+                    if event is done:
+                        return
+                    yield event
+            finally:
+                checkout.__exit__(None, None, None)
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise
+        except Exception:
+            self._count("errors")
+            raise
+        finally:
+            self._release()
+
+    def metrics(self):
+        """Request counters, queue depth, latency percentiles and component metrics"""
+        with self._lock:
+            ordered = sorted(self._latencies)
+            report = {
+                **self._stats,
+                "in_flight": len(self._inflight),
+                "pending": self._pending,
+                "queued": max(0, self._pending - self.max_workers),
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "p50_s": _percentile(ordered, 50),
+                "p95_s": _percentile(ordered, 95),
+                "p99_s": _percentile(ordered, 99),
+            }
+        report["ready"] = self.warm.ready.is_set()
+        report["warmup_timings_s"] = dict(self.warm.timings)
+        if self.warm.prerouter is not None:
+            report["router"] = self.warm.prerouter.metrics()
+        rag_backend = getattr(self.warm.rag_tool, "backend", None)
+        if hasattr(rag_backend, "update"):
+            report["index"] = rag_backend.metrics()
+        from .config import llm_metrics
+        providers = llm_metrics(self.warm.llm) if self.warm.llm is not None else {}
+        if providers:
+            report["llm_providers"] = providers
+        if self.warm.llm_cache is not None:
+            report["llm_cache"] = self.warm.llm_cache.metrics()
+        if self.answer_cache is not None:
+            report["answer_cache"] = self.answer_cache.metrics()
+        from .web_search import get_web_search_client
+        report["web_search"] = get_web_search_client().metrics()
+        return report
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+def resolve_admin_source(source, admin_root):
+    """PDF paths of an index update source, all of which must lie under admin_root.
+
+    source is a directory or manifest file, relative to admin_root or
+    absolute; raises ValueError for anything resolving outside admin_root.
+    """
+    from .ingest import discover_pdfs
+    root = os.path.realpath(admin_root)
+
+    def inside(path):
+        path = os.path.realpath(path)
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"{path} is outside the admin root")
+        return path
+
+    source = inside(os.path.join(root, source))
+    if not os.path.exists(source):
+        raise ValueError(f"{source} does not exist")
+    return [inside(path) for path in discover_pdfs(source)]
+
+def create_app(service, admin_token=None, admin_root=None):
+    """FastAPI app serving a QueryService; warmup starts with the app.
+
+    POST /admin/index exists only when admin_token and admin_root are given;
+    it needs an "Authorization: Bearer <admin_token>" header and only reads
+    PDFs under admin_root.
+    """
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI, Header, HTTPException
+    from fastapi.responses import StreamingResponse
+    from pydantic import BaseModel
+
+    class Query(BaseModel):
+        question: str
+
+    class IndexUpdate(BaseModel):
+        source: str
+        remove_missing: bool = False
+
+    @asynccontextmanager
+    async def lifespan(app):
+        service.warm.warmup()
+        yield
+        service.close()
+
+    app = FastAPI(title="agentic_ai RAG service", lifespan=lifespan)
+
+    @app.post("/query")
+    async def query(body: Query):
+        start = time.perf_counter()
+        try:
+            answer, coalesced = await service.answer(body.question)
+        except QueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Query timed out")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error: {e}")
+        return {"answer": answer, "coalesced": coalesced, "latency_s": time.perf_counter() - start}
+
+    @app.post("/query/stream")
+    async def query_stream(body: Query):
+        events = service.stream(body.question)
+        try:
+            # Start the stream here so a full queue is still a 503, not a broken stream
+            first = await events.__anext__()
+        except QueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Query timed out")
+
+        async def lines():
+            yield json.dumps(first) + "\n"
+            try:
+                async for event in events:
+                    yield json.dumps(event) + "\n"
+            except Exception as e:
+                yield json.dumps({"type": "error", "error": f"Error: {e}"}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    if admin_token and admin_root:
+        @app.post("/admin/index")
+        async def update_index(body: IndexUpdate, authorization: str = Header(default="")):
+            if not hmac.compare_digest(authorization.encode(), f"Bearer {admin_token}".encode()):
+                raise HTTPException(status_code=401, detail="Invalid admin token")
+            index = getattr(service.warm.rag_tool, "backend", None)
+            if not hasattr(index, "update"):
+                raise HTTPException(status_code=404, detail="The service is not using a live index")
+            try:
+                paths = resolve_admin_source(body.source, admin_root)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Error: {e}")
+            if body.remove_missing and not paths:
+                raise HTTPException(status_code=400, detail="Refusing to remove every source: no PDFs found")
+            try:
+                return await asyncio.to_thread(index.update, paths, remove_missing=body.remove_missing)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error: {e}")
+
+    @app.get("/metrics")
+    async def metrics():
+        return service.metrics()
+
+    @app.get("/healthz")
+    async def healthz():
+        if service.warm.error is not None:
+            raise HTTPException(status_code=500, detail=f"Error: {service.warm.error}")
+        return {"ready": service.warm.ready.is_set()}
+
+    return app
+
+def build_service(workers=4, max_queue=32, timeout_s=120.0, prerouted=True, fused_verification=True,
+                  answer_cache=None, **warm_options):
+    """QueryService over a WarmCrew with one pooled crew per worker.
+
+    warm_options (llm, rag_tool, llm_options, ...) are passed to WarmCrew.
+    When rag_tool serves a LiveIndex, every published version invalidates
+    answer_cache.
+    """
+    from .warm import WarmCrew
+    warm = WarmCrew(pool_size=workers, prerouted=prerouted, fused_verification=fused_verification,
+                    **warm_options)
+    rag_backend = getattr(warm.rag_tool, "backend", None)
+    if answer_cache is not None and hasattr(rag_backend, "on_swap"):
+        rag_backend.on_swap(lambda version, index_dir, backend: answer_cache.set_index_version(version))
+    return QueryService(warm, max_workers=workers, max_queue=max_queue, timeout_s=timeout_s,
+                        answer_cache=answer_cache)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the RAG crew over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4, help="Queries running at once")
+    parser.add_argument("--max-queue", type=int, default=32, help="Queries waiting for a worker before 503s")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds a request waits for its answer")
+    parser.add_argument("--no-preroute", action="store_true", help="Keep the Router agent in the crew")
+    parser.add_argument("--no-fused", action="store_true", help="Use the separate grader tasks")
+    parser.add_argument("--llm-cache", action="store_true", help="Memoize LLM calls in the on-disk LLM cache")
+    parser.add_argument("--answer-cache", action="store_true",
+                        help="Reuse answers to near-duplicate questions (see semantic_cache.py)")
+    parser.add_argument("--llm-pool", action="store_true",
+                        help="Per-agent models over a provider pool with failover (config.setup_llms)")
+    parser.add_argument("--live-index", metavar="ROOT",
+                        help="Serve a hot-swappable corpus index (see live_index.py) instead of the PDF tool")
+    parser.add_argument("--admin-root", help="Directory POST /admin/index may read PDFs from")
+    parser.add_argument("--admin-token", default=os.environ.get("AGENTIC_AI_ADMIN_TOKEN"),
+                        help="Bearer token enabling POST /admin/index (default: AGENTIC_AI_ADMIN_TOKEN)")
+    args = parser.parse_args()
+
+    import uvicorn
+    os.environ.setdefault("AGENTIC_AI_ENV", "production")
+    llm_cache = None
+    if args.llm_cache:
+        from .llm_cache import LLMResponseCache, default_cache_path
+        llm_cache = LLMResponseCache(default_cache_path())
+    warm_options = {"llm_cache": llm_cache}
+    if args.llm_pool:
+        from .config import setup_llms
+        warm_options["llm"] = setup_llms()
+    if args.live_index:
+        from .live_index import setup_live_corpus
+        warm_options["rag_tool"] = setup_live_corpus(args.live_index)
+    answer_cache = None
+    if args.answer_cache:
+        from .semantic_cache import SemanticCache
+        answer_cache = SemanticCache()
+    service = build_service(args.workers, args.max_queue, args.timeout,
+                            prerouted=not args.no_preroute, fused_verification=not args.no_fused,
+                            answer_cache=answer_cache, **warm_options)
+    uvicorn.run(create_app(service, admin_token=args.admin_token, admin_root=args.admin_root),
+                host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
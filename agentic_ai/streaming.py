@@ -0,0 +1,163 @@
+"""
+Streaming entry point for the RAG crew.
+
+The stages before the answer task run in a background thread and are
+reported as they complete; the final answer is then streamed token by token
+straight from the LLM instead of arriving as one blob.
+"""
+import asyncio
+import queue
+import threading
+import time
+from crewai import Crew
+from .crew import plan_query
+from .instrumentation import LLMCallHandler, QueryTrace, activate, export_trace
+from .tasks import Verification, verification_passed
+
+_DONE = object()
+
+def _event(kind, start, **fields):
+    return {"type": kind, "elapsed_s": time.perf_counter() - start, **fields}
+
+def _says_yes(text):
+    return text.strip().strip("'\".").lower().startswith("yes")
+
+def _interpolate(text, inputs):
+    for key, value in inputs.items():
+        text = text.replace("{" + key + "}", str(value))
+    return text
+
+def answer_messages(task, inputs):
+    """Build the chat messages for an answer task from its completed context"""
+    agent = task.agent
+    context = "\n\n".join(
+        f"{source.agent.role} output:\n{source.output.raw}"
+        for source in (task.context or [])
+        if source.output is not None
+    )
+    return [
+        ("system", f"You are {agent.role}. {agent.backstory}\nYour personal goal is: {agent.goal}"),
+        ("human", (
+            f"{_interpolate(task.description, inputs)}\n\n"
+            f"This is the expected criteria for your final answer: {_interpolate(task.expected_output, inputs)}\n\n"
+            f"This is the context you're working with:\n{context}"
+        )),
+    ]
+
+def stream_rag_query(crew, question, llm=None, prerouter=None, cache=None, parallel=None):
+    """Run a query and yield stage events followed by streamed answer tokens.
+
+    Events are dicts with a 'type' of 'route', 'retrieval', 'task',
+    'verdict', 'token' or 'answer' and the seconds elapsed since the call. llm defaults to the
+    answer agent's LLM (the ChatOpenAI client from setup_llm).
+    Grader outputs are 'verdict' events in both flows: the fused
+    verification reports relevant and grounded at once, the grader and
+    hallucination grader of the five-task flow report relevant, then
+    relevant and grounded.
+    crew must not be in use elsewhere while the stream runs (a freshly built
+    or pooled crew, see warm.WarmCrew.checkout); its tasks run in place
+    because crew.copy() loses task context links and LLM callbacks.
+    """
+    start = time.perf_counter()
+    trace = QueryTrace(question)
+    vector = None
+    if cache is not None:
+        index_version = cache.index_version
+        vector = cache.embed(question)
+        cached = cache.get(question, vector=vector)
+        if cached is not None:
+            yield _event("answer", start, answer=str(cached), cached=True)
+            return
+
+    crew, inputs, decision = plan_query(crew, question, trace, prerouter=prerouter, parallel=parallel)
+    if decision is not None:
+        yield _event("route", start, route=decision.route, method=decision.method, confidence=decision.confidence)
+    if "context" in inputs:
+        yield _event("retrieval", start, sources=["vectorstore", "web"])
+
+    answer_task = crew.tasks[-1]
+    stage_tasks = crew.tasks[:-1]
+    events = queue.Queue()
+
+    def on_stage_done(output):
+        if crew.task_callback is not None:
+            crew.task_callback(output)
+        events.put(output)
+
+    # Set every task's callback explicitly (Crew only fills in unset ones) and restore them afterwards
+    callbacks = [task.callback for task in stage_tasks]
+    for task in stage_tasks:
+        task.callback = on_stage_done
+    stages = Crew(
+        agents=[task.agent for task in stage_tasks],
+        tasks=stage_tasks,
+        verbose=crew.verbose,
+    )
+
+    def run_stages():
+        try:
+            with activate(trace):
+                stages.kickoff(inputs=inputs)
+        except Exception as e:
+            events.put(e)
+        finally:
+            for task, callback in zip(stage_tasks, callbacks):
+                task.callback = callback
+            events.put(_DONE)
+
+    threading.Thread(target=run_stages, daemon=True).start()
+
+    retrieved, verdict, relevant = None, None, None
+    while True:
+        item = events.get()
+        if item is _DONE:
+            break
+        if isinstance(item, Exception):
+            raise item
+        if isinstance(item.pydantic, Verification):
+            verdict = item
+            yield _event("verdict", start, relevant=item.pydantic.relevant, grounded=item.pydantic.grounded)
+            continue
+        if item.agent == "Router":
+            yield _event("route", start, route=item.raw.strip(), method="llm")
+            continue
+        if item.agent == "Answer Grader":
+            relevant = _says_yes(item.raw)
+            yield _event("verdict", start, relevant=relevant)
+            continue
+        if item.agent == "Hallucination Grader":
+            yield _event("verdict", start, relevant=relevant, grounded=_says_yes(item.raw))
+            continue
+        if item.agent == "Retriever":
+            retrieved = item.raw
+        yield _event("task", start, agent=item.agent, output=item.raw)
+
+    # A passing fused verification means the retrieved answer is final
+    if verdict is not None and verification_passed(verdict):
+        answer = trace.uncompacted.get(retrieved, retrieved) or ""
+        yield _event("token", start, text=answer)
+    else:
+        llm = llm or answer_task.agent.llm
+        parts = []
+        stream = llm.stream(answer_messages(answer_task, inputs), config={"callbacks": [LLMCallHandler(trace)]})
+        for chunk in stream:
+            text = getattr(chunk, "content", chunk)
+            if text:
+                parts.append(text)
+                yield _event("token", start, text=text)
+        answer = "".join(parts)
+        trace.stage_done("answer_task (streamed)", agent=answer_task.agent.role)
+
+    if cache is not None:
+        cache.put(question, answer, vector=vector, index_version=index_version)
+    export_trace(trace)
+    yield _event("answer", start, answer=answer, cached=False)
+
+async def astream_rag_query(crew, question, **kwargs):
+    """Async-iterator version of stream_rag_query"""
+    stream = stream_rag_query(crew, question, **kwargs)
+    while True:
+        event = await asyncio.to_thread(next, stream, _DONE)
+        if event is _DONE:
+            return
+        yield event
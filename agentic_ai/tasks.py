@@ -1,10 +1,85 @@
+from typing import Optional
 from crewai import Task
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
+from pydantic import BaseModel, Field
 from .tools import router_tool
 
-def create_tasks(agents):
-    """Create all tasks for the RAG crew"""
-    
-    router_task = Task(
+class Verification(BaseModel):
+    """Structured verdict of the fused verification task"""
+    relevant: bool = Field(description="Whether the retrieved content is relevant to the question")
+    grounded: bool = Field(description="Whether the answer is grounded in / supported by the retrieved facts")
+    reason: str = Field(default="", description="One short sentence justifying the verdict")
+
+def verification_passed(output):
+    """Whether a fused verification task output accepted the retrieved answer"""
+    verdict = getattr(output, 'pydantic', None)
+    return isinstance(verdict, Verification) and verdict.relevant and verdict.grounded
+
+class VerifiedAnswerTask(Task):
+    """Answer task skipped when verification_task accepted the retrieved answer.
+
+    The gate is checked here rather than with crewai's ConditionalTask: in
+    crewai 0.51-0.55 a ConditionalTask past the second task raises
+    IndexError, and crew.copy() turns it into a plain Task. A skipped run
+    outputs an empty answer, which final_answer replaces with the retriever
+    output.
+    """
+    verification_task: Optional[Task] = Field(default=None, exclude=True)
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        if self.verification_task is not None and verification_passed(self.verification_task.output):
+            self.output = TaskOutput(
+                description=self.description,
+                raw="",
+                agent=self.agent.role if self.agent else "",
+                output_format=OutputFormat.RAW,
+            )
+            return self.output
+        return super().execute_sync(agent, context, tools)
+
+def create_fused_verification_tasks(agents, retriever_task):
+    """Create the single-call verification task and the answer task it gates.
+
+    The answer task only runs when the verdict fails; otherwise the retriever
+    output is already the final answer.
+    """
+    verification_task = Task(
+        description=(
+            "Evaluate the response from the retriever task for the question {question}. "
+            "Decide whether the retrieved content is relevant to the question, and whether the answer "
+            "is grounded in / supported by the retrieved facts."
+        ),
+        expected_output=(
+            "A JSON object with boolean fields 'relevant' and 'grounded' and a one sentence 'reason'. "
+            "Do not provide any preamble or explanations outside the JSON object."
+        ),
+        agent=agents['verification_grader'],
+        context=[retriever_task],
+        output_pydantic=Verification,
+    )
+
+    answer_task = VerifiedAnswerTask(
+        description=(
+            "Provide the final comprehensive answer to: {question}. "
+            "The verification found the retrieved information is not fully relevant or grounded. "
+            "Use the information from the retriever task, acknowledge that it may be insufficient "
+            "and provide the best possible answer based on available information."
+        ),
+        expected_output=(
+            "A comprehensive and well-structured answer to the user's question based on the retrieved information. "
+            "Provide detailed explanations and context from the retrieved content."
+        ),
+        verification_task=verification_task,
+        context=[retriever_task, verification_task],
+        agent=agents['answer_grader'],
+    )
+
+    return [verification_task, answer_task]
+
+def create_router_task(agent):
+    """Create the task that routes a question to the vectorstore or web search"""
+    return Task(
         description=(
             "Analyse the keywords in the question {question}"
             "Based on the keywords decide whether it is eligible for a vectorstore search or a web search."
@@ -16,26 +91,78 @@ def create_tasks(agents):
             "Give a binary choice 'websearch' or 'vectorstore' based on the question"
             "Do not provide any other premable or explaination."
         ),
-        agent=agents['router'],
+        agent=agent,
         tools=[router_tool],
     )
 
-    retriever_task = Task(
+def create_synthesis_task(agent):
+    """Create the task that answers from parallel retrieval results in the {context} input"""
+    return Task(
         description=(
-            "Extract information for the question: {question}. "
-            "The router has determined the search method. "
-            "If the router output is 'websearch', use web_search_tool to search the web. "
-            "If the router output is 'vectorstore', use rag_tool to search the PDF document. "
-            "Provide detailed information based on the search results."
+            "Answer the question: {question}. "
+            "Both the PDF vectorstore and a web search were queried. Their merged and deduplicated results, "
+            "with a relevance score per source, are:\n{context}\n"
+            "Use the results most relevant to the question and provide detailed information based on them."
         ),
         expected_output=(
-            "Detailed information about the question based on the appropriate search method. "
+            "Detailed information about the question based on the retrieved results. "
             "Use the search results to provide a comprehensive answer."
         ),
-        agent=agents['retriever'],
-        context=[router_task],
+        agent=agent,
     )
 
+def create_tasks(agents, prerouted=False, fused_verification=False, parallel_retrieval=False):
+    """Create all tasks for the RAG crew.
+
+    With prerouted=True the router task is dropped and the retriever reads the
+    route from the {route} input decided before kickoff (see router.PreRouter).
+    With parallel_retrieval=True the router and tool-using retriever are
+    replaced by a synthesis task over the {context} input (see
+    parallel_retrieval.py).
+    With fused_verification=True the grader and hallucination tasks are
+    replaced by one structured verification call that can skip answer_task.
+    """
+    
+    router_task = None if prerouted or parallel_retrieval else create_router_task(agents['router'])
+
+    if parallel_retrieval:
+        retriever_task = create_synthesis_task(agents['synthesizer'])
+    elif prerouted:
+        retriever_task = Task(
+            description=(
+                "Extract information for the question: {question}. "
+                "The router has determined the search method: {route}. "
+                "If the search method is 'websearch', use web_search_tool to search the web. "
+                "If the search method is 'vectorstore', use rag_tool to search the PDF document. "
+                "Provide detailed information based on the search results."
+            ),
+            expected_output=(
+                "Detailed information about the question based on the appropriate search method. "
+                "Use the search results to provide a comprehensive answer."
+            ),
+            agent=agents['retriever'],
+        )
+    else:
+        retriever_task = Task(
+            description=(
+                "Extract information for the question: {question}. "
+                "The router has determined the search method. "
+                "If the router output is 'websearch', use web_search_tool to search the web. "
+                "If the router output is 'vectorstore', use rag_tool to search the PDF document. "
+                "Provide detailed information based on the search results."
+            ),
+            expected_output=(
+                "Detailed information about the question based on the appropriate search method. "
+                "Use the search results to provide a comprehensive answer."
+            ),
+            agent=agents['retriever'],
+            context=[router_task],
+        )
+
+    head = [retriever_task] if router_task is None else [router_task, retriever_task]
+    if fused_verification:
+        return head + create_fused_verification_tasks(agents, retriever_task)
+
     grader_task = Task(
         description=(
             "Based on the response from the retriever task for the quetion {question} evaluate whether the retrieved content is relevant to the question."
@@ -79,4 +206,4 @@ def create_tasks(agents):
         agent=agents['answer_grader'],
     )
     
-    return [router_task, retriever_task, grader_task, hallucination_task, answer_task]
+    return head + [grader_task, hallucination_task, answer_task]
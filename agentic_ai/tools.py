@@ -1,52 +1,123 @@
-from crewai_tools import PDFSearchTool, tool
-from langchain_community.tools.tavily_search import TavilySearchResults
-import requests
 import os
+import threading
+from crewai_tools import PDFSearchTool, tool
+from . import pdf_cache
+from .instrumentation import tool_span
+from .web_search import format_results, get_web_search_client
+from .chunking import CHUNK_OVERLAP, CHUNK_SIZE
+from .embeddings import EMBEDDER_MODEL
 
-# Download and setup PDF
-def setup_pdf():
-    """Download the Attention is All You Need paper"""
-    pdf_url = "https://proceedings.neurips.cc/paper_files/paper/2017/file/3f5ee243547dee91fbd053c1c4a845aa-Paper.pdf"
-    response = requests.get(pdf_url)
-    
-    with open("attention_is_all_you_need.pdf", "wb") as file:
-        file.write(response.content)
-    
-    return PDFSearchTool(pdf='attention_is_all_you_need.pdf',
-        config=dict(
-            llm=dict(
-                provider="groq",
-                config=dict(
-                    model="llama3-8b-8192",
-                ),
+PDF_URL = "https://proceedings.neurips.cc/paper_files/paper/2017/file/3f5ee243547dee91fbd053c1c4a845aa-Paper.pdf"
+PDF_FILENAME = "attention_is_all_you_need.pdf"
+QUERY_SEPARATOR = "||"  # splits web_search_tool query variants; ';' occurs in ordinary queries
+
+class InstrumentedPDFSearchTool(PDFSearchTool):
+    """PDFSearchTool whose calls are timed into the active query trace"""
+
+    def _run(self, *args, **kwargs):
+        with tool_span("rag_tool"):
+            return super()._run(*args, **kwargs)
+
+def pdf_tool_config(db_dir, key):
+    """Embedchain config for PDFSearchTool with a persistent vector store"""
+    return dict(
+        llm=dict(
+            provider="groq",
+            config=dict(
+                model="llama3-8b-8192",
             ),
-            embedder=dict(
-                provider="huggingface",
-                config=dict(
-                    model="BAAI/bge-small-en-v1.5",
-                ),
+        ),
+        embedder=dict(
+            provider="huggingface",
+            config=dict(
+                model=EMBEDDER_MODEL,
             ),
-        )
+        ),
+        vectordb=dict(
+            provider="chroma",
+            config=dict(
+                collection_name=f"pdf-{key[:16]}",
+                dir=db_dir,
+            ),
+        ),
+        chunker=dict(
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
+        ),
     )
 
+_prepared = {}  # (pdf_url, cache_dir) -> prepare_pdf result
+_prepared_lock = threading.Lock()
+
+def prepare_pdf(pdf_url=PDF_URL, cache_dir=None):
+    """Fetch the PDF into the cache and describe its content-addressed index.
+
+    Memoized per (pdf_url, cache_dir) for the life of the process, so the
+    several components that need it at startup share one fetch.
+    """
+    cache_dir = cache_dir or pdf_cache.DEFAULT_CACHE_DIR
+    with _prepared_lock:
+        if (pdf_url, cache_dir) not in _prepared:
+            _prepared[pdf_url, cache_dir] = _prepare_pdf(pdf_url, cache_dir)
+        return dict(_prepared[pdf_url, cache_dir])
+
+def _prepare_pdf(pdf_url, cache_dir):
+    # Other URLs get a file named after the URL's hash, so they never overwrite each other
+    filename = PDF_FILENAME if pdf_url == PDF_URL else None
+    pdf_path, sha256, _ = pdf_cache.fetch_pdf(pdf_url, cache_dir, filename=filename)
+    key = pdf_cache.index_key(pdf_url, sha256, EMBEDDER_MODEL, CHUNK_SIZE, CHUNK_OVERLAP)
+    return {
+        "url": pdf_url,
+        "path": pdf_path,
+        "sha256": sha256,
+        "cache_dir": cache_dir,
+        "key": key,
+        "index_dir": pdf_cache.index_dir(cache_dir, key),
+    }
+
+# Download and setup PDF
+def setup_pdf(pdf_url=PDF_URL, cache_dir=None, hybrid=False, rerank=False):
+    """Download the Attention is All You Need paper and build its search tool.
+
+    The download and the embedded index are cached on disk, keyed on the PDF
+    content, embedder model and chunking parameters, so warm starts skip both.
+    With hybrid=True the tool combines BM25 and dense search (see hybrid.py)
+    instead of using PDFSearchTool, optionally reranking with a cross-encoder.
+    """
+    pdf = prepare_pdf(pdf_url, cache_dir)
+    if hybrid:
+        from .hybrid import setup_hybrid
+        from .ingest import ingest
+        hybrid_dir = os.path.join(pdf["index_dir"], "hybrid")
+        ingest([pdf["path"]], hybrid_dir, backend="numpy", workers=1,
+               chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+        return setup_hybrid(hybrid_dir, rerank=rerank)
+    
+    # Embedchain skips re-embedding a document whose hash is already stored in
+    # the persisted collection, so a warm start only reloads the vectors.
+    rag_tool = InstrumentedPDFSearchTool(pdf=pdf["path"], config=pdf_tool_config(pdf["index_dir"], pdf["key"]))
+
+    if not pdf_cache.is_index_built(pdf["cache_dir"], pdf["key"]):
+        pdf_cache.mark_index_built(pdf["cache_dir"], pdf["key"], {
+            "url": pdf_url,
+            "sha256": pdf["sha256"],
+            "embedder_model": EMBEDDER_MODEL,
+            "chunk_size": CHUNK_SIZE,
+            "chunk_overlap": CHUNK_OVERLAP,
+        })
+    return rag_tool
+
 # Create a proper web search tool with a predictable name
 @tool
 def web_search_tool(query: str) -> str:
-    """Search the web for information using Tavily search engine."""
-    tavily_search = TavilySearchResults(k=3)
-    results = tavily_search.run(query)
+    """Search the web for information using Tavily search engine. Separate several query variants with ' || ' to search them all at once."""
+    client = get_web_search_client()
+    queries = [variant.strip() for variant in query.split(QUERY_SEPARATOR) if variant.strip()] or [query]
+    with tool_span("web_search_tool"):
+        results = client.search_many(queries) if len(queries) > 1 else client.search(queries[0])
     
     # Format the results into a readable string
-    if isinstance(results, list):
-        formatted_results = []
-        for i, result in enumerate(results, 1):
-            if isinstance(result, dict):
-                url = result.get('url', 'No URL')
-                content = result.get('content', 'No content')
-                formatted_results.append(f"Result {i}:\nURL: {url}\nContent: {content}\n")
-        return "\n".join(formatted_results)
-    else:
-        return str(results)
+    return format_results(results)
 
 @tool
 def router_tool(question):
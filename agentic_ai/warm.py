@@ -0,0 +1,124 @@
+"""
+Startup-optimized serving: build the crew graph once and warm it in the background.
+
+Nothing heavy is imported when this module loads. warmup() imports crewai and
+LangChain, loads the embedding model, prepares the PDF index and builds a
+pool of crews on a background thread, so a worker can start accepting
+requests immediately; queries wait only for whatever is not ready yet.
+"""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+class WarmCrew:
+    """A pool of prebuilt crews reused across queries.
+
+    Each pooled crew is built once and reused; a query checks one out for
+    its whole run, so concurrent queries never share agent or task state.
+    llm and rag_tool default to setup_llm(**llm_options) and setup_pdf(); llm
+    may also be a per-agent mapping from config.setup_llms.
+    llm_cache is shared by every pooled crew (see llm_cache.py).
+    """
+
+    def __init__(self, pool_size=1, prerouted=False, fused_verification=False,
+                 llm=None, rag_tool=None, llm_options=None, preload_embeddings=True, llm_cache=None):
+        self.pool_size = pool_size
+        self.prerouted = prerouted
+        self.fused_verification = fused_verification
+        self.llm = llm
+        self.rag_tool = rag_tool
+        self.llm_options = llm_options or {}
+        self.preload_embeddings = preload_embeddings
+        self.llm_cache = llm_cache
+        self.prerouter = None
+        self.ready = threading.Event()
+        self.error = None
+        self.timings = {}
+        self._pool = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def warmup(self, background=True):
+        """Start building everything; returns immediately when background=True"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._build, name="agentic-ai-warmup", daemon=True)
+                self._thread.start()
+        if not background:
+            self.wait()
+        return self
+
+    def _timed(self, name, build):
+        start = time.perf_counter()
+        result = build()
+        self.timings[name] = time.perf_counter() - start
+        return result
+
+    def _build(self):
+        try:
+            from .crew import create_rag_crew
+            if self.llm is None:
+                from .config import setup_llm
+                self.llm = self._timed("llm", lambda: setup_llm(**self.llm_options))
+            if self.preload_embeddings:
+                from .embeddings import preload_embeddings
+                self._timed("embedding_model", preload_embeddings)
+            if self.rag_tool is None:
+                from .tools import setup_pdf
+                self.rag_tool = self._timed("rag_tool", setup_pdf)
+            if self.prerouted:
+                from .router import PreRouter
+                from .config import llm_for
+                self.prerouter = self._timed("prerouter", lambda: PreRouter.from_pdf(llm_for(self.llm, "router")))
+            for _ in range(self.pool_size):
+                self._pool.put(self._timed("crew", lambda: create_rag_crew(
+                    self.llm, self.rag_tool,
+                    prerouted=self.prerouted,
+                    fused_verification=self.fused_verification,
+                    llm_cache=self.llm_cache,
+                )))
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+
+    def wait(self, timeout=None):
+        """Block until warmup has finished, re-raising any warmup error"""
+        if self._thread is None:
+            self.warmup()
+        if not self.ready.wait(timeout):
+            raise TimeoutError("RAG crew warmup did not finish in time")
+        if self.error is not None:
+            raise self.error
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Borrow a pooled crew for one query, waiting for warmup if needed"""
+        self.wait(timeout)
+        crew = self._pool.get(timeout=timeout)
+        try:
+            yield crew
+        finally:
+            self._pool.put(crew)
+
+    def run(self, question, timeout=None, **kwargs):
+        """Run a query on a pooled crew, waiting for warmup if needed"""
+        from .crew import run_rag_query
+        with self.checkout(timeout) as crew:
+            return run_rag_query(crew, question, prerouter=self.prerouter, **kwargs)
+
+_default = None
+_default_lock = threading.Lock()
+
+def warmup(**options):
+    """Start warming the process-wide WarmCrew in the background and return it"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = WarmCrew(**options)
+    return _default.warmup()
+
+def get_warm_crew():
+    """The process-wide WarmCrew, warming it up if nobody has yet"""
+    return _default if _default is not None else warmup()
@@ -0,0 +1,143 @@
+"""
+Web search client behind web_search_tool.
+
+Talks to the Tavily search API over one pooled HTTP session, caches results
+by normalized query text for a TTL, and fans several queries out concurrently,
+merging their results by URL. TAVILY_API_URL points it at a local stub server.
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+TAVILY_API_URL = "https://api.tavily.com/search"
+
+def normalize_query(query):
+    """Cache key for a query: lowercased, whitespace-collapsed, trimmed"""
+    return re.sub(r"\s+", " ", query.lower()).strip(" ?!.")
+
+class WebSearchClient:
+    """Pooled, cached Tavily search client"""
+
+    def __init__(self, api_key=None, api_url=None, max_results=3, ttl_s=600.0,
+                 max_entries=2048, pool_size=16, timeout=15):
+        self.api_key = api_key or os.environ.get("TAVILY_API_KEY")
+        self.api_url = api_url or os.environ.get("TAVILY_API_URL", TAVILY_API_URL)
+        self.max_results = max_results
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 502, 503, 504),
+                              allowed_methods=None),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size)
+        self._cache = OrderedDict()  # normalized query -> (results, stored_at)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "cache_hits": 0, "cache_misses": 0, "errors": 0}
+        self._request_latency_s = 0.0
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= self.ttl_s:
+                self._cache.move_to_end(key)
+                self._stats["cache_hits"] += 1
+                return entry[0]
+            if entry is not None:
+                del self._cache[key]
+            self._stats["cache_misses"] += 1
+            return None
+
+    def search(self, query):
+        """Search one query, returning a list of {url, title, content, score} dicts"""
+        key = normalize_query(query)
+        results = self._cached(key)
+        if results is not None:
+            return results
+
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                self.api_url,
+                json={"api_key": self.api_key, "query": query, "max_results": self.max_results},
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            results = response.json().get("results", [])
+        except (requests.RequestException, ValueError):
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._stats["requests"] += 1
+                self._request_latency_s += time.perf_counter() - start
+
+        with self._lock:
+            self._cache[key] = (results, time.monotonic())
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return results
+
+    def search_many(self, queries):
+        """Search query variants concurrently and merge the results by URL.
+
+        Variants that normalize to the same query are searched once. A URL
+        found by several queries keeps its highest score; results are ordered
+        by score.
+        """
+        unique = {}
+        for query in queries:
+            unique.setdefault(normalize_query(query), query)
+        merged = {}
+        for results in self._executor.map(self.search, unique.values()):
+            for result in results:
+                url = result.get("url")
+                if url not in merged or result.get("score", 0) > merged[url].get("score", 0):
+                    merged[url] = result
+        return sorted(merged.values(), key=lambda result: result.get("score", 0), reverse=True)
+
+    def metrics(self):
+        """Request latency and cache-hit counters"""
+        with self._lock:
+            lookups = self._stats["cache_hits"] + self._stats["cache_misses"]
+            return {
+                **self._stats,
+                "cache_entries": len(self._cache),
+                "cache_hit_rate": self._stats["cache_hits"] / lookups if lookups else 0.0,
+                "mean_request_latency_s": (
+                    self._request_latency_s / self._stats["requests"] if self._stats["requests"] else None
+                ),
+            }
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_web_search_client():
+    """Process-wide web search client shared by every web_search_tool call"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = WebSearchClient()
+        return _client
+
+def format_results(results):
+    """Format search results into a readable string for the agent"""
+    formatted_results = []
+    for i, result in enumerate(results, 1):
+        url = result.get('url', 'No URL')
+        content = result.get('content', 'No content')
+        formatted_results.append(f"Result {i}:\nURL: {url}\nContent: {content}\n")
+    return "\n".join(formatted_results)
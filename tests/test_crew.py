@@ -0,0 +1,72 @@
+"""
+Crews run by run_rag_batch keep the task wiring create_rag_crew built.
+
+Agent.execute_task is replaced by a stub that records the context each
+agent receives, so no LLM is called.
+"""
+from functools import partial
+import pytest
+
+crewai = pytest.importorskip("crewai")
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from agentic_ai.benchmarks.pipeline import StubRagTool
+from agentic_ai.crew import create_rag_crew, run_rag_batch
+
+@pytest.fixture
+def executed(monkeypatch):
+    """(role, context) of every agent run, in order"""
+    calls = []
+
+    def execute_task(self, task, context=None, tools=None):
+        calls.append((self.role, context or ""))
+        if self.role == "Router":
+            return "vectorstore"
+        if self.role == "Retriever":
+            return "Retrieved: self-attention relates positions of one sequence"
+        return "yes" if "Grader" in self.role else "final answer"
+
+    monkeypatch.setattr(crewai.Agent, "execute_task", execute_task)
+    return calls
+
+def make_crew_factory(**options):
+    return partial(create_rag_crew, FakeListChatModel(responses=["unused"]), StubRagTool(), **options)
+
+def test_batch_downstream_tasks_receive_retriever_output(executed):
+    results = run_rag_batch(make_crew_factory(), ["What is self-attention?"] * 3, max_concurrency=2)
+
+    assert all(item["error"] is None for item in results)
+    contexts = [context for role, context in executed if role in ("Answer Grader", "Final Answer Provider")]
+    assert len(contexts) == 6
+    assert all("Retrieved: self-attention" in context for context in contexts)
+
+def test_batch_fused_verification_skips_answer_task(executed, monkeypatch):
+    def execute_task(self, task, context=None, tools=None):
+        executed.append((self.role, context or ""))
+        if self.role == "Verification Grader":
+            return '{"relevant": true, "grounded": true, "reason": "on topic"}'
+        return "Retrieved: self-attention relates positions of one sequence"
+
+    monkeypatch.setattr(crewai.Agent, "execute_task", execute_task)
+    results = run_rag_batch(make_crew_factory(fused_verification=True), ["What is self-attention?"] * 2,
+                            max_concurrency=2)
+
+    assert [str(item["result"]) for item in results] == ["Retrieved: self-attention relates positions of one sequence"] * 2
+    assert sum(role == "Verification Grader" for role, _ in executed) == 2
+    assert not any(role == "Final Answer Provider" for role, _ in executed)
+
+def test_stream_answer_reads_retriever_output(executed, monkeypatch):
+    from agentic_ai.streaming import stream_rag_query
+    crew = make_crew_factory()()
+    llm = FakeListChatModel(responses=["streamed answer"])
+    prompts = []
+    monkeypatch.setattr(type(llm), "stream", lambda self, messages, config=None: prompts.append(messages) or
+                        iter(["streamed ", "answer"]))
+
+    events = list(stream_rag_query(crew, "What is self-attention?", llm=llm))
+
+    verdicts = [event for event in events if event["type"] == "verdict"]
+    assert verdicts[-1]["relevant"] is True and verdicts[-1]["grounded"] is True
+    assert not any(event["type"] == "task" and "Grader" in event["agent"] for event in events)
+    assert "Retrieved: self-attention" in prompts[0][1][1]
+    assert events[-1]["answer"] == "streamed answer"
@@ -0,0 +1,24 @@
+from agentic_ai.instrumentation import trace_query
+from agentic_ai.parallel_retrieval import ParallelRetrieval, split_tool_output
+
+class StubPDFTool:
+    def _run(self, query):
+        return f"Relevant Content:\n{query} in the encoder\n\n{query} in the decoder"
+
+class StubWebClient:
+    def search(self, question):
+        return [{"score": 0.9, "content": f"{question} on the web", "url": "https://example.com"}]
+
+def test_split_tool_output():
+    assert split_tool_output("Relevant Content:\nfirst chunk\n\nsecond chunk\n") == ["first chunk", "second chunk"]
+
+def test_retrieve_records_tool_spans_in_callers_trace():
+    parallel = ParallelRetrieval(lambda: None, StubPDFTool(), web_client=StubWebClient())
+    try:
+        with trace_query("attention") as trace:
+            _, entries = parallel.retrieve("attention")
+    finally:
+        parallel.close()
+
+    assert len(entries) == 3
+    assert set(trace.summary()["tools"]) == {"rag_tool", "web_search_tool"}